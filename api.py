@@ -3,44 +3,136 @@
 FastAPI implementation for the Voice AI Agent
 """
 
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
 import os
-import tempfile
+import secrets
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import aiofiles
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
-from voice_agent.chain import create_voice_agent
+from voice_agent.audio import float_to_pcm16, to_wav_bytes, wav_header
+from voice_agent.cache import SynthesisCache, synthesis_cache_key
+from voice_agent.chain import get_voice_agent
+from voice_agent.tts_engine import TTSEngine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, 
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Models loaded when a worker starts; any other model is loaded on first use
+PRELOAD_MODELS = [m for m in os.getenv("TTS_PRELOAD_MODELS", "kokoro").split(",") if m]
+
+# TTSEngine options: inference precision on CUDA ('fp32', 'fp16' or 'bf16', unset uses
+# each model's default), whether to compile the model with torch.compile,
+# whether to quantize it to int8 when running on CPU, whether to keep
+# synthesized waveforms on disk, the Kokoro backend ('torch' or 'onnx') and its
+# ONNX model, and whether small speed changes are applied by resampling
+ENGINE_OPTIONS = {
+    "precision": os.getenv("TTS_PRECISION") or None,
+    "compile_model": os.getenv("TTS_COMPILE", "0") == "1",
+    "enable_int8": os.getenv("TTS_INT8", "0") == "1",
+    "disk_cache": os.getenv("TTS_DISK_CACHE", "0") == "1",
+    "backend": os.getenv("TTS_BACKEND", "torch"),
+    "onnx_model": os.getenv("TTS_ONNX_MODEL") or None,
+    "resample_speed": os.getenv("TTS_RESAMPLE_SPEED", "0") == "1",
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the preloaded TTS models when the worker starts rather than at import time"""
+    global synthesis_queue, inference_executor
+    for model_type in PRELOAD_MODELS:
+        get_voice_agent(model_type=model_type, **ENGINE_OPTIONS)
+    
+    if PROCESS_WORKERS > 0:
+        # forkserver keeps the workers from inheriting the event loop and CUDA state
+        inference_executor = ProcessPoolExecutor(
+            max_workers=PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=load_worker_agents
+        )
+    
+    synthesis_queue = asyncio.Queue()
+    batcher_task = asyncio.create_task(batcher())
+    yield
+    batcher_task.cancel()
+    if inference_executor is not None:
+        inference_executor.shutdown(cancel_futures=True)
+        inference_executor = None
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Voice AI Agent API",
     description="API for text-to-speech synthesis and voice cloning",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Initialize agents for both model types
-kokoro_agent = create_voice_agent(model_type="kokoro")
-zonos_agent = create_voice_agent(model_type="zonos")
+# Free space /dev/shm needs before temporary audio goes there; Docker gives
+# containers only 64 MiB of it unless run with --shm-size
+SHM_MIN_FREE_BYTES = 512 * 1024 * 1024
 
-# Default to Kokoro for backward compatibility
-active_agent = kokoro_agent
 
-# Get the engines for easy access
-kokoro_tts_engine = kokoro_agent["tts_engine"]
-zonos_tts_engine = zonos_agent["tts_engine"]
+def default_temp_dir() -> str:
+    """Return RAM-backed /dev/shm when it has room for uploads, else a local directory"""
+    try:
+        if shutil.disk_usage("/dev/shm").free >= SHM_MIN_FREE_BYTES:
+            return "/dev/shm/voice_ai"
+    except OSError:
+        pass
+    return "temp"
+
 
 # Create temp directory if it doesn't exist
-TEMP_DIR = Path("temp")
-TEMP_DIR.mkdir(exist_ok=True)
+TEMP_DIR = Path(os.getenv("VOICE_TEMP_DIR") or default_temp_dir())
+TEMP_DIR.mkdir(exist_ok=True, parents=True)
+
+# Cache of synthesized WAV bytes so repeated requests skip inference
+synthesis_cache = SynthesisCache(max_entries=128, max_bytes=64 * 1024 * 1024)
+synthesis_cache_lock = asyncio.Lock()
+
+# Synthesis results still being produced, keyed by cache key, so identical
+# concurrent requests share a single inference
+inflight_synthesis: Dict[str, asyncio.Future] = {}
+
+# Limit concurrent inference on the shared models; one inference already saturates the CPU/GPU
+SYNTH_SEM = asyncio.Semaphore(int(os.getenv("TTS_CONCURRENCY", "1")))
+
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Voices cloned from uploaded audio, keyed by (model_type, content hash)
+cloned_voice_cache: Dict[Tuple[str, str], str] = {}
+
+# Synthesis requests are queued and handed to the model in micro-batches
+MAX_BATCH = int(os.getenv("TTS_MAX_BATCH", "8"))
+MAX_WAIT_MS = float(os.getenv("TTS_MAX_WAIT_MS", "10"))
+synthesis_queue: Optional[asyncio.Queue] = None
+
+# Optionally run batches in worker processes that each hold their own models,
+# so pure-Python preprocessing doesn't contend with the event loop for the GIL
+PROCESS_WORKERS = int(os.getenv("TTS_PROCESS_WORKERS", "0"))
+inference_executor: Optional[ProcessPoolExecutor] = None
+
+# Each worker process holds its own models, so allow one batch in flight per worker
+WORKER_SEM = asyncio.Semaphore(max(PROCESS_WORKERS, 1))
 
 # Pydantic models for request/response
 class SynthesizeRequest(BaseModel):
     text: str
-    voice: str = "af_heart"  # Used for Kokoro model
+    voice: Optional[str] = None  # Kokoro voice (af_heart if unset) or saved Zonos voice (default speaker if unset)
     reference_audio: Optional[str] = None  # Path to reference audio for Zonos
     model_type: str = "kokoro"  # 'kokoro' or 'zonos'
     language: str = "en-us"  # Language code (primarily for Zonos)
@@ -55,6 +147,157 @@ class VoiceIDResponse(BaseModel):
     voice_id: str
     model_type: str
 
+def request_voice(request: "SynthesizeRequest") -> Optional[str]:
+    """Voice to synthesize a request with, filling in the Kokoro default voice"""
+    if request.voice is None and request.model_type == "kokoro":
+        return "af_heart"
+    return request.voice
+
+def wav_response(wav_bytes: bytes, name: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Return in-memory WAV bytes as a downloadable audio response"""
+    return Response(
+        content=wav_bytes,
+        media_type="audio/wav",
+        headers={"Content-Disposition": f'attachment; filename="{name}.wav"', **(headers or {})}
+    )
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check whether an If-None-Match header matches the given ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+async def get_agent(model_type: str):
+    """Get the agent for a model type, loading it off the event loop on first use"""
+    return await asyncio.to_thread(get_voice_agent, model_type, **ENGINE_OPTIONS)
+
+async def run_chain(chain, inputs):
+    """Run a blocking chain call off the event loop, gated by SYNTH_SEM"""
+    async with SYNTH_SEM:
+        return await asyncio.to_thread(chain, inputs)
+
+def load_worker_agents():
+    """Load the preloaded models in an inference worker process"""
+    for model_type in PRELOAD_MODELS:
+        get_voice_agent(model_type=model_type, **ENGINE_OPTIONS)
+
+def generate_batch_in_worker(model_type, texts, voice, speed, reference_audio):
+    """Synthesize a batch inside an inference worker process"""
+    return get_voice_agent(model_type, **ENGINE_OPTIONS)["tts_engine"].generate_batch(
+        texts,
+        voice=voice,
+        speed=speed,
+        reference_audio=reference_audio
+    )
+
+async def run_batch(settings: Tuple, group: List[Tuple[str, asyncio.Future]]):
+    """Run one batch of requests that share their settings and resolve their futures"""
+    model_type, voice, speed, reference_audio = settings
+    texts = [text for text, _ in group]
+    try:
+        if inference_executor is not None:
+            async with WORKER_SEM:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    inference_executor,
+                    generate_batch_in_worker,
+                    model_type, texts, voice, speed, reference_audio
+                )
+        else:
+            tts_engine = (await get_agent(model_type))["tts_engine"]
+            async with SYNTH_SEM:
+                results = await asyncio.to_thread(
+                    tts_engine.generate_batch,
+                    texts,
+                    voice=voice,
+                    speed=speed,
+                    reference_audio=reference_audio
+                )
+    except Exception as e:
+        for _, future in group:
+            if not future.done():
+                future.set_exception(e)
+    else:
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+async def batcher():
+    """Collect queued synthesis requests into batches and start each batch as one model call"""
+    loop = asyncio.get_running_loop()
+    # Batches run concurrently up to SYNTH_SEM; keep references so they aren't garbage collected
+    running = set()
+    while True:
+        items = [await synthesis_queue.get()]
+        deadline = loop.time() + MAX_WAIT_MS / 1000
+        while len(items) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(synthesis_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        # A batch shares one model and voice, so group the requests by their settings
+        groups = {}
+        for settings, text, future in items:
+            groups.setdefault(settings, []).append((text, future))
+        
+        for settings, group in groups.items():
+            task = asyncio.create_task(run_batch(settings, group))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+async def synthesize_batched(model_type: str, text: str, voice: str, speed: float, reference_audio: Optional[str]):
+    """Queue a synthesis request for the batcher and wait for its (audio, sample_rate) result"""
+    future = asyncio.get_running_loop().create_future()
+    await synthesis_queue.put(((model_type, voice, speed, reference_audio), text, future))
+    return await future
+
+async def synthesize_single_flight(cache_key: str, request: "SynthesizeRequest") -> bytes:
+    """Synthesize a request into WAV bytes, joining an identical in-flight request if there is one"""
+    future = inflight_synthesis.get(cache_key)
+    if future is not None:
+        # Shield so a disconnecting client doesn't cancel the result for everyone else
+        return await asyncio.shield(future)
+    
+    future = asyncio.get_running_loop().create_future()
+    inflight_synthesis[cache_key] = future
+    try:
+        audio, sample_rate = await synthesize_batched(
+            request.model_type,
+            request.text,
+            request_voice(request),
+            request.speed,
+            request.reference_audio if request.model_type == "zonos" else None
+        )
+        wav_bytes = to_wav_bytes(audio, sample_rate)
+        
+        async with synthesis_cache_lock:
+            synthesis_cache.put(cache_key, wav_bytes)
+        
+        future.set_result(wav_bytes)
+        return wav_bytes
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved in case nobody else was waiting
+        future.exception()
+        raise
+    finally:
+        inflight_synthesis.pop(cache_key, None)
+        if not future.done():
+            future.cancel()
+
+async def save_upload(upload: UploadFile, destination: Path) -> str:
+    """Stream an uploaded file to disk without loading it fully into memory, returning its content hash"""
+    digest = hashlib.blake2b(digest_size=16)
+    async with aiofiles.open(destination, "wb") as f:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await f.write(chunk)
+    return digest.hexdigest()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -63,60 +306,84 @@ async def root():
 @app.get("/voices", response_model=VoiceListResponse)
 async def list_voices(model_type: str = "kokoro"):
     """List available voices for the specified model"""
-    if model_type == "kokoro":
-        voices = kokoro_tts_engine.list_voices()
-    elif model_type == "zonos":
-        voices = zonos_tts_engine.list_voices()
-    else:
+    if model_type not in ("kokoro", "zonos"):
         raise HTTPException(status_code=400, detail=f"Unsupported model type: {model_type}")
     
+    # Listing voices only reads the voices directory, so don't load the model for it
+    voices = TTSEngine.list_voices_static(model_type)
+    
     # Add the model type to the response
     return {**voices, "model_type": model_type}
 
 @app.post("/synthesize")
-async def synthesize(request: SynthesizeRequest):
+async def synthesize(request: SynthesizeRequest, if_none_match: Optional[str] = Header(None)):
     """
     Synthesize speech from text using either Kokoro or Zonos model
     """
-    # Create temporary output file
-    output_file = TEMP_DIR / f"{next(tempfile._get_candidate_names())}.wav"
+    if request.model_type not in ("kokoro", "zonos"):
+        raise HTTPException(status_code=400, detail=f"Unsupported model type: {request.model_type}")
+    
+    # Zonos speakers come from the reference audio, or else from a saved voice. The
+    # voice version changes when a voice is re-cloned, so cached audio isn't reused
+    voice = request_voice(request)
+    reference_audio = request.reference_audio if request.model_type == "zonos" else None
+    tts_engine = (await get_agent(request.model_type))["tts_engine"]
+    version = tts_engine.voice_version(voice, reference_audio)
+    voice_key = f"{reference_audio}|{voice}|{version}"
+    cache_key = synthesis_cache_key(request.text, voice_key, request.speed, request.model_type)
+    
+    # Identical requests for the same voice version produce identical audio, so clients
+    # and proxies may reuse it
+    etag_source = json.dumps({**request.dict(), "voice_version": version}, sort_keys=True)
+    etag = f'"{hashlib.md5(etag_source.encode()).hexdigest()}"'
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag})
+    cache_headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    
+    async with synthesis_cache_lock:
+        wav_bytes = synthesis_cache.get(cache_key)
+    if wav_bytes is not None:
+        return wav_response(wav_bytes, cache_key, cache_headers)
     
     try:
-        # Select the appropriate agent based on the model type
-        if request.model_type == "kokoro":
-            current_agent = kokoro_agent
-            audio_path = current_agent["voice_chain"]({
-                "text": request.text,
-                "voice_id": request.voice,
-                "speed": request.speed,
-                "output_path": str(output_file)
-            })["audio_path"]
-        elif request.model_type == "zonos":
-            current_agent = zonos_agent
-            
-            # For Zonos, use reference_audio if provided
-            params = {
-                "text": request.text,
-                "speed": request.speed,
-                "output_path": str(output_file)
-            }
-            
-            # Add reference_audio if provided
-            if request.reference_audio:
-                params["reference_audio"] = request.reference_audio
-            
-            audio_path = current_agent["voice_chain"](params)["audio_path"]
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported model type: {request.model_type}")
-        
-        return FileResponse(
-            path=audio_path,
-            media_type="audio/wav",
-            filename=os.path.basename(audio_path)
-        )
+        wav_bytes = await synthesize_single_flight(cache_key, request)
+        return wav_response(wav_bytes, cache_key, cache_headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def stream_wav(tts_engine, params):
+    """Yield a streaming WAV: the header first, then PCM for each synthesized chunk"""
+    chunks = tts_engine.synthesize_stream(**params)
+    yield wav_header(tts_engine.sample_rate)
+    
+    while True:
+        # Only hold the inference slot while the next chunk is being produced
+        async with SYNTH_SEM:
+            chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        yield float_to_pcm16(chunk).tobytes()
+
+@app.post("/synthesize/stream")
+async def synthesize_stream(request: SynthesizeRequest):
+    """
+    Synthesize speech from text, streaming audio back as each segment is generated
+    """
+    if request.model_type == "kokoro":
+        tts_engine = (await get_agent("kokoro"))["tts_engine"]
+    elif request.model_type == "zonos":
+        tts_engine = (await get_agent("zonos"))["tts_engine"]
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported model type: {request.model_type}")
+    
+    params = {
+        "text": request.text,
+        "voice": request_voice(request),
+        "speed": request.speed,
+        "reference_audio": request.reference_audio
+    }
+    return StreamingResponse(stream_wav(tts_engine, params), media_type="audio/wav")
+
 @app.post("/clone", response_model=VoiceIDResponse)
 async def clone_voice(
     audio: UploadFile = File(...),
@@ -129,26 +396,24 @@ async def clone_voice(
     Clone a voice from an audio sample for either Kokoro or Zonos model
     """
     # Save uploaded file
-    temp_audio = TEMP_DIR / f"{next(tempfile._get_candidate_names())}{os.path.splitext(audio.filename)[1]}"
+    temp_audio = TEMP_DIR / f"{secrets.token_hex(8)}{os.path.splitext(audio.filename)[1]}"
     
     try:
-        with open(temp_audio, "wb") as f:
-            content = await audio.read()
-            f.write(content)
+        await save_upload(audio, temp_audio)
         
         # Select the appropriate agent based on the model type
         if model_type == "kokoro":
-            current_agent = kokoro_agent
+            current_agent = await get_agent("kokoro")
         elif model_type == "zonos":
-            current_agent = zonos_agent
+            current_agent = await get_agent("zonos")
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported model type: {model_type}")
         
-        cloned_voice_id = current_agent["cloning_chain"]({
+        cloned_voice_id = (await run_chain(current_agent["cloning_chain"], {
             "audio_path": str(temp_audio),
             "voice_id": voice_id,
             "make_default": make_default
-        })["voice_id"]
+        }))["voice_id"]
         
         return {"voice_id": cloned_voice_id, "model_type": model_type}
     except Exception as e:
@@ -171,58 +436,35 @@ async def synthesize_with_clone(
     Clone a voice and synthesize text with it in one step, supporting both Kokoro and Zonos models
     """
     # Save uploaded file
-    temp_audio = TEMP_DIR / f"{next(tempfile._get_candidate_names())}{os.path.splitext(audio.filename)[1]}"
-    output_file = TEMP_DIR / f"{next(tempfile._get_candidate_names())}.wav"
+    temp_audio = TEMP_DIR / f"{secrets.token_hex(8)}{os.path.splitext(audio.filename)[1]}"
     
     try:
-        with open(temp_audio, "wb") as f:
-            content = await audio.read()
-            f.write(content)
+        audio_hash = await save_upload(audio, temp_audio)
         
         # Select the appropriate agent based on the model type
-        if model_type == "kokoro":
-            current_agent = kokoro_agent
-            
-            # Clone voice with Kokoro
-            voice_id = current_agent["cloning_chain"]({
-                "audio_path": str(temp_audio),
-                "voice_id": None
-            })["voice_id"]
-            
-            # Synthesize speech with cloned voice using Kokoro
-            audio_path = current_agent["voice_chain"]({
-                "text": text,
-                "voice_id": voice_id,
-                "speed": speed,
-                "output_path": str(output_file)
-            })["audio_path"]
-            
-        elif model_type == "zonos":
-            current_agent = zonos_agent
-            
-            # Clone voice with Zonos
-            voice_id = current_agent["cloning_chain"]({
+        if model_type not in ("kokoro", "zonos"):
+            raise HTTPException(status_code=400, detail=f"Unsupported model type: {model_type}")
+        current_agent = await get_agent(model_type)
+        
+        # Reuse the voice if the same audio has been cloned before
+        voice_id = cloned_voice_cache.get((model_type, audio_hash))
+        if voice_id is None or make_default:
+            voice_id = (await run_chain(current_agent["cloning_chain"], {
                 "audio_path": str(temp_audio),
-                "voice_id": None,
+                "voice_id": f"{model_type}_{audio_hash}",
                 "make_default": make_default
-            })["voice_id"]
-            
-            # For Zonos, use the reference audio directly
-            audio_path = current_agent["voice_chain"]({
-                "text": text,
-                "reference_audio": str(temp_audio),  # Use the uploaded audio file directly
-                "speed": speed,
-                "output_path": str(output_file)
-            })["audio_path"]
-            
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported model type: {model_type}")
+            }))["voice_id"]
+            cloned_voice_cache[(model_type, audio_hash)] = voice_id
         
-        return FileResponse(
-            path=audio_path,
-            media_type="audio/wav",
-            filename=os.path.basename(audio_path)
-        )
+        # Synthesize speech with the cloned voice (a saved speaker embedding for Zonos)
+        result = await run_chain(current_agent["voice_chain"], {
+            "text": text,
+            "voice_id": voice_id,
+            "speed": speed,
+            "output_path": None
+        })
+        
+        return wav_response(to_wav_bytes(result["audio"], result["sample_rate"]), voice_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -231,4 +473,12 @@ async def synthesize_with_clone(
             temp_audio.unlink()
 
 if __name__ == "__main__":
-    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        reload=False
+    )
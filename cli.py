@@ -4,15 +4,21 @@ Command-line interface for the Voice AI Agent
 """
 
 import argparse
+import logging
 import os
 import sys
 
 from voice_agent.chain import create_voice_agent
+from voice_agent.tts_engine import TTSEngine
 
 def main():
     """
     Main entry point for the CLI
     """
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, 
+                       format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
     parser = argparse.ArgumentParser(description="Voice AI Agent - Generate high-quality speech from text")
     
     # Text input options
@@ -40,8 +46,8 @@ def main():
                         help="Language code for Zonos (e.g., 'en-us', 'ja-jp')")
     
     # Output options
-    parser.add_argument("--output", "-o", type=str, required=True,
-                        help="Output audio file path")
+    parser.add_argument("--output", "-o", type=str,
+                        help="Output audio file path (required unless --list-voices is used)")
     
     # Voice parameters
     parser.add_argument("--speed", type=float, default=1.0,
@@ -49,13 +55,9 @@ def main():
     
     args = parser.parse_args()
     
-    # Create the voice agent with the selected model
-    agent = create_voice_agent(model_type=args.model, language=args.language)
-    tts_engine = agent["tts_engine"]
-    
-    # List available voices
+    # List available voices without loading the model
     if args.list_voices:
-        voices = tts_engine.list_voices()
+        voices = TTSEngine.list_voices_static(args.model)
         print(f"Available {args.model} voices:")
         print("  Preset voices:")
         for voice in voices["preset"]:
@@ -65,6 +67,13 @@ def main():
             print(f"    - {voice}")
         return 0
     
+    if not args.output:
+        print("Error: Please provide an output path using --output")
+        return 1
+    
+    # Create the voice agent with the selected model
+    agent = create_voice_agent(model_type=args.model, language=args.language)
+    
     # Check if we need to clone a voice
     if args.clone_from:
         if not os.path.exists(args.clone_from):
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+"""
+Development server for the Voice AI Agent API with auto-reload enabled
+"""
+
+import uvicorn
+
+if __name__ == "__main__":
+    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
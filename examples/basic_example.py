@@ -3,6 +3,7 @@
 Basic example of using the Voice AI Agent
 """
 
+import logging
 import os
 import sys
 from pathlib import Path
@@ -16,6 +17,10 @@ def main():
     """
     Run a basic example of the Voice AI Agent
     """
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, 
+                       format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
     print("Voice AI Agent - Basic Example")
     print("==============================")
     
@@ -3,37 +3,86 @@
 RunPod serverless handler for Voice AI Agent
 """
 
+import asyncio
+import logging
 import os
-import base64
-import tempfile
+import secrets
+import shutil
 import time
 from pathlib import Path
+from typing import List
+import httpx
 import runpod
-from runpod.serverless.utils import download_files_from_urls, rp_cleanup
-import soundfile as sf
 
-from voice_agent.chain import create_voice_agent
+# pybase64 is a SIMD-accelerated drop-in replacement for the base64 module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+from voice_agent.audio import to_wav_bytes
+from voice_agent.cache import SynthesisCache, file_digest, synthesis_cache_key
+from voice_agent.chain import get_voice_agent
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, 
+                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 # Global variables
 AGENT = None
-TEMP_DIR = Path("/tmp/voice_ai")
+# Free space /dev/shm needs before downloads go there; Docker gives containers
+# only 64 MiB of it unless run with --shm-size
+SHM_MIN_FREE_BYTES = 512 * 1024 * 1024
+
+
+def default_temp_dir() -> str:
+    """Return RAM-backed /dev/shm when it has room for downloads, else /tmp on the overlay filesystem"""
+    try:
+        if shutil.disk_usage("/dev/shm").free >= SHM_MIN_FREE_BYTES:
+            return "/dev/shm/voice_ai"
+    except OSError:
+        pass
+    return "/tmp/voice_ai"
+
+
+TEMP_DIR = Path(os.getenv("VOICE_TEMP_DIR") or default_temp_dir())
 TEMP_DIR.mkdir(exist_ok=True, parents=True)
 
+# Cache of synthesis responses so repeated requests skip inference
+SYNTHESIS_CACHE = SynthesisCache(max_entries=128)
+
+# Voices cloned from downloaded audio, keyed by content hash
+CLONED_VOICE_CACHE = {}
+
+async def download_files_from_urls(urls: List[str]) -> List[str]:
+    """Download all URLs concurrently into TEMP_DIR and return the local paths"""
+    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
+        responses = await asyncio.gather(*[client.get(url) for url in urls])
+    
+    paths = []
+    for url, response in zip(urls, responses):
+        response.raise_for_status()
+        name = url.split("?")[0].rstrip("/").split("/")[-1] or "audio"
+        path = TEMP_DIR / f"{secrets.token_hex(8)}_{name}"
+        await asyncio.to_thread(path.write_bytes, response.content)
+        paths.append(str(path))
+    return paths
+
+def cleanup_files(paths: List[str]):
+    """Remove downloaded files"""
+    for path in paths:
+        Path(path).unlink(missing_ok=True)
+
 def initialize_agent():
-    """Initialize the voice agent once when the container starts"""
+    """Initialize the voice agent once, on the first job or when called explicitly"""
     global AGENT
     print("Initializing Voice AI Agent...")
     start_time = time.time()
-    AGENT = create_voice_agent()
+    AGENT = get_voice_agent()
     print(f"Voice AI Agent initialized in {time.time() - start_time:.2f} seconds")
     return AGENT
 
-def audio_to_base64(audio_path):
-    """Convert audio file to base64 string"""
-    with open(audio_path, "rb") as audio_file:
-        return base64.b64encode(audio_file.read()).decode("utf-8")
-
-def handle_synthesize(job_input):
+async def handle_synthesize(job_input):
     """Handle speech synthesis request"""
     text = job_input.get("text", "")
     voice = job_input.get("voice", "af_heart")
@@ -42,38 +91,36 @@ def handle_synthesize(job_input):
     if not text:
         return {"error": "No text provided for synthesis"}
     
-    # Create output file path
-    output_path = str(TEMP_DIR / f"{next(tempfile._get_candidate_names())}.wav")
+    cache_key = synthesis_cache_key(text, voice, speed, "kokoro")
+    cached = SYNTHESIS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     
     try:
-        audio_path = AGENT["voice_chain"]({
+        result = await asyncio.to_thread(AGENT["voice_chain"], {
             "text": text,
             "voice_id": voice,
             "speed": speed,
-            "output_path": output_path
-        })["audio_path"]
-        
-        # Convert audio to base64
-        audio_base64 = audio_to_base64(audio_path)
+            "output_path": None
+        })
+        sample_rate = result["sample_rate"]
         
-        # Get audio information
-        audio_data, sample_rate = sf.read(audio_path)
-        duration = len(audio_data) / sample_rate
+        # Encode the WAV in memory and convert it to base64
+        audio_base64 = base64.b64encode(to_wav_bytes(result["audio"], sample_rate)).decode("ascii")
         
-        return {
+        response = {
             "audio_base64": audio_base64,
             "content_type": "audio/wav",
-            "duration": duration,
+            "duration": result["num_samples"] / sample_rate,
             "sample_rate": sample_rate
         }
+        SYNTHESIS_CACHE.put(cache_key, response)
+        
+        return response
     except Exception as e:
         return {"error": f"Synthesis failed: {str(e)}"}
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(output_path):
-            os.remove(output_path)
 
-def handle_clone(job_input):
+async def handle_clone(job_input):
     """Handle voice cloning request"""
     audio_url = job_input.get("audio_url")
     voice_id = job_input.get("voice_id")
@@ -81,16 +128,18 @@ def handle_clone(job_input):
     if not audio_url:
         return {"error": "No audio URL provided for voice cloning"}
     
+    downloaded_files = []
     try:
         # Download the audio file
-        downloaded_files = download_files_from_urls([audio_url])
+        downloaded_files = await download_files_from_urls([audio_url])
         audio_path = downloaded_files[0]
         
         # Clone the voice
-        cloned_voice_id = AGENT["cloning_chain"]({
+        result = await asyncio.to_thread(AGENT["cloning_chain"], {
             "audio_path": audio_path,
             "voice_id": voice_id
-        })["voice_id"]
+        })
+        cloned_voice_id = result["voice_id"]
         
         return {
             "voice_id": cloned_voice_id
@@ -99,9 +148,9 @@ def handle_clone(job_input):
         return {"error": f"Voice cloning failed: {str(e)}"}
     finally:
         # Clean up downloaded files
-        rp_cleanup()
+        cleanup_files(downloaded_files)
 
-def handle_synthesize_with_clone(job_input):
+async def handle_synthesize_with_clone(job_input):
     """Handle combined voice cloning and synthesis request"""
     text = job_input.get("text", "")
     audio_url = job_input.get("audio_url")
@@ -112,55 +161,53 @@ def handle_synthesize_with_clone(job_input):
     if not audio_url:
         return {"error": "No audio URL provided for voice cloning"}
     
+    downloaded_files = []
     try:
         # Download the audio file
-        downloaded_files = download_files_from_urls([audio_url])
+        downloaded_files = await download_files_from_urls([audio_url])
         audio_path = downloaded_files[0]
         
-        # Clone the voice
-        voice_id = AGENT["cloning_chain"]({
-            "audio_path": audio_path,
-            "voice_id": None
-        })["voice_id"]
-        
-        # Create output file path
-        output_path = str(TEMP_DIR / f"{next(tempfile._get_candidate_names())}.wav")
+        # Reuse the voice if the same audio has been cloned before
+        audio_hash = await asyncio.to_thread(file_digest, audio_path)
+        voice_id = CLONED_VOICE_CACHE.get(audio_hash)
+        if voice_id is None:
+            result = await asyncio.to_thread(AGENT["cloning_chain"], {
+                "audio_path": audio_path,
+                "voice_id": f"kokoro_{audio_hash}"
+            })
+            voice_id = result["voice_id"]
+            CLONED_VOICE_CACHE[audio_hash] = voice_id
         
         # Synthesize speech with cloned voice
-        audio_path = AGENT["voice_chain"]({
+        result = await asyncio.to_thread(AGENT["voice_chain"], {
             "text": text,
             "voice_id": voice_id,
             "speed": speed,
-            "output_path": output_path
-        })["audio_path"]
-        
-        # Convert audio to base64
-        audio_base64 = audio_to_base64(audio_path)
+            "output_path": None
+        })
+        sample_rate = result["sample_rate"]
         
-        # Get audio information
-        audio_data, sample_rate = sf.read(audio_path)
-        duration = len(audio_data) / sample_rate
+        # Encode the WAV in memory and convert it to base64
+        audio_base64 = base64.b64encode(to_wav_bytes(result["audio"], sample_rate)).decode("ascii")
         
         return {
             "audio_base64": audio_base64,
             "content_type": "audio/wav",
-            "duration": duration,
+            "duration": result["num_samples"] / sample_rate,
             "sample_rate": sample_rate,
             "voice_id": voice_id
         }
     except Exception as e:
         return {"error": f"Operation failed: {str(e)}"}
     finally:
-        # Clean up downloaded files and temporary output
-        rp_cleanup()
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        # Clean up downloaded files
+        cleanup_files(downloaded_files)
 
 def list_voices():
     """List available voices"""
     return AGENT["tts_engine"].list_voices()
 
-def handler(job):
+async def handler(job):
     """
     Handler function for RunPod serverless
     
@@ -178,19 +225,20 @@ def handler(job):
     job_input = job["input"]
     operation = job_input.get("operation", "synthesize")
     
+    # Load the model lazily so a cold container only pays for it once a job arrives
+    if AGENT is None:
+        await asyncio.to_thread(initialize_agent)
+    
     if operation == "synthesize":
-        return handle_synthesize(job_input)
+        return await handle_synthesize(job_input)
     elif operation == "clone":
-        return handle_clone(job_input)
+        return await handle_clone(job_input)
     elif operation == "synthesize_with_clone":
-        return handle_synthesize_with_clone(job_input)
+        return await handle_synthesize_with_clone(job_input)
     elif operation == "list_voices":
         return list_voices()
     else:
         return {"error": f"Unknown operation: {operation}"}
 
-# Initialize the model when the container starts
-initialize_agent()
-
 # Start the RunPod serverless handler
 runpod.serverless.start({"handler": handler})
@@ -4,18 +4,21 @@ Test script for the RunPod serverless handler
 This simulates RunPod serverless job requests to test functionality locally
 """
 
-import base64
+import asyncio
 import argparse
+import binascii
+import shutil
 from pathlib import Path
 
 # Import the handler from runpod_handler.py
 from runpod_handler import handler, initialize_agent
 
-def save_base64_audio(base64_str, output_path):
-    """Save base64 encoded audio to a file"""
-    audio_data = base64.b64decode(base64_str)
+def save_base64_audio(base64_str, output_path, chunk_size=8192):
+    """Save base64 encoded audio to a file, decoding it in chunks"""
+    # chunk_size is a multiple of 4 so every slice but the last is a whole number of base64 quads
     with open(output_path, "wb") as f:
-        f.write(audio_data)
+        for i in range(0, len(base64_str), chunk_size):
+            f.write(binascii.a2b_base64(base64_str[i:i + chunk_size]))
     print(f"Saved audio to: {output_path}")
 
 def test_synthesize():
@@ -30,7 +33,7 @@ def test_synthesize():
         }
     }
     
-    result = handler(job)
+    result = asyncio.run(handler(job))
     
     if "error" in result:
         print(f"Error: {result['error']}")
@@ -56,7 +59,7 @@ def test_list_voices():
         }
     }
     
-    result = handler(job)
+    result = asyncio.run(handler(job))
     print("Available voices:")
     print(f"Preset voices: {', '.join(result['preset'])}")
     print(f"Cloned voices: {', '.join(result['cloned'])}")
@@ -85,9 +88,12 @@ def test_voice_cloning():
     import runpod_handler
     orig_download_fn = runpod_handler.download_files_from_urls
     
-    def mock_download_fn(urls):
+    async def mock_download_fn(urls):
         print(f"Mocking download from {urls}")
-        return [str(sample_audio)]
+        # Copy the sample since the handler deletes downloaded files afterwards
+        local_copy = runpod_handler.TEMP_DIR / sample_audio.name
+        shutil.copy(sample_audio, local_copy)
+        return [str(local_copy)]
     
     runpod_handler.download_files_from_urls = mock_download_fn
     
@@ -100,7 +106,7 @@ def test_voice_cloning():
     }
     
     try:
-        result = handler(job)
+        result = asyncio.run(handler(job))
         
         if "error" in result:
             print(f"Error: {result['error']}")
@@ -114,7 +120,7 @@ def test_voice_cloning():
                 "operation": "list_voices"
             }
         }
-        voices_result = handler(list_job)
+        voices_result = asyncio.run(handler(list_job))
         print("Updated voice list:")
         print(f"Preset voices: {', '.join(voices_result['preset'])}")
         print(f"Cloned voices: {', '.join(voices_result['cloned'])}")
@@ -140,9 +146,12 @@ def test_synthesize_with_clone():
     import runpod_handler
     orig_download_fn = runpod_handler.download_files_from_urls
     
-    def mock_download_fn(urls):
+    async def mock_download_fn(urls):
         print(f"Mocking download from {urls}")
-        return [str(sample_audio)]
+        # Copy the sample since the handler deletes downloaded files afterwards
+        local_copy = runpod_handler.TEMP_DIR / sample_audio.name
+        shutil.copy(sample_audio, local_copy)
+        return [str(local_copy)]
     
     runpod_handler.download_files_from_urls = mock_download_fn
     
@@ -156,7 +165,7 @@ def test_synthesize_with_clone():
     }
     
     try:
-        result = handler(job)
+        result = asyncio.run(handler(job))
         
         if "error" in result:
             print(f"Error: {result['error']}")
@@ -0,0 +1,54 @@
+"""
+Tests for the WAV helpers in voice_agent.audio
+"""
+
+import os
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from voice_agent.audio import to_wav_bytes, wav_header, write_wav
+
+
+def test_wav_header_with_known_length():
+    header = wav_header(24000, 100)
+    assert len(header) == 44
+    riff_size, = struct.unpack_from("<I", header, 4)
+    sample_rate, byte_rate = struct.unpack_from("<II", header, 24)
+    data_size, = struct.unpack_from("<I", header, 40)
+    assert (riff_size, data_size) == (36 + 200, 200)
+    assert (sample_rate, byte_rate) == (24000, 48000)
+
+
+def test_wav_header_for_streaming_uses_maximum_size():
+    header = wav_header(24000)
+    riff_size, = struct.unpack_from("<I", header, 4)
+    data_size, = struct.unpack_from("<I", header, 40)
+    assert riff_size == 0xFFFFFFFF
+    assert data_size == 0xFFFFFFFF - 36
+
+
+def test_write_wav_retries_short_writev(tmp_path, monkeypatch):
+    audio = np.linspace(-1.0, 1.0, 1000, dtype=np.float32)
+    path = tmp_path / "out.wav"
+
+    # Write at most 7 bytes of the first buffer per call
+    def short_writev(fd, buffers):
+        return os.write(fd, bytes(buffers[0][:7]))
+
+    monkeypatch.setattr(os, "writev", short_writev, raising=False)
+    write_wav(str(path), audio, 24000)
+    assert path.read_bytes() == to_wav_bytes(audio, 24000)
+
+
+def test_write_wav_without_writev(tmp_path, monkeypatch):
+    audio = np.linspace(-1.0, 1.0, 1000, dtype=np.float32)
+    path = tmp_path / "out.wav"
+    write = os.write
+
+    monkeypatch.delattr(os, "writev", raising=False)
+    monkeypatch.setattr(os, "write", lambda fd, buf: write(fd, bytes(buf[:5])))
+    write_wav(str(path), audio, 24000)
+    assert path.read_bytes() == to_wav_bytes(audio, 24000)
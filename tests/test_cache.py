@@ -0,0 +1,44 @@
+"""
+Tests for SynthesisCache in voice_agent.cache
+"""
+
+from voice_agent.cache import SynthesisCache
+
+
+def test_evicts_oldest_entries_over_max_bytes():
+    cache = SynthesisCache(max_entries=10, max_bytes=100)
+    cache.put("a", b"x" * 40)
+    cache.put("b", b"x" * 40)
+    cache.put("c", b"x" * 40)
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    assert cache._size == 80
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = SynthesisCache(max_entries=10, max_bytes=100)
+    cache.put("a", b"x" * 40)
+    cache.put("a", b"x" * 10)
+    assert len(cache) == 1
+    assert cache._size == 10
+
+
+def test_recently_used_entries_survive_eviction():
+    cache = SynthesisCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+
+
+def test_file_entries_are_removed_with_their_file(tmp_path):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF")
+    cache = SynthesisCache(max_entries=1)
+    cache.put("a", str(path))
+    assert cache._size == 0
+    cache.put("b", b"xyz")
+    assert not path.exists()
+    assert cache._size == 3
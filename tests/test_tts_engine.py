@@ -0,0 +1,37 @@
+"""
+Tests for text segmentation in voice_agent.tts_engine
+"""
+
+import pytest
+
+pytest.importorskip("torch")
+
+from voice_agent.tts_engine import TTSEngine
+
+
+@pytest.fixture
+def engine():
+    # _segment_text only needs the class constants, so skip loading a model
+    return TTSEngine.__new__(TTSEngine)
+
+
+def test_short_text_is_one_segment(engine):
+    assert engine._segment_text("Hello there. How are you?", r"\n+") == ["Hello there. How are you?"]
+
+
+def test_splits_on_pattern_and_drops_blank_parts(engine):
+    assert engine._segment_text("One.\n\n  \nTwo.", r"\n+") == ["One.", "Two."]
+
+
+def test_long_paragraph_is_packed_by_sentence(engine):
+    sentence = "This sentence is exactly forty chars ok."
+    text = " ".join([sentence] * 20)
+    segments = engine._segment_text(text, None)
+    assert len(segments) > 1
+    assert all(len(s) <= TTSEngine.MAX_SEGMENT_CHARS for s in segments)
+    assert " ".join(segments) == text
+
+
+def test_overlong_sentence_is_kept_whole(engine):
+    text = "word " * 100
+    assert engine._segment_text(text.strip(), None) == [text.strip()]
@@ -0,0 +1,128 @@
+"""
+Audio encoding helpers for the Voice AI Agent
+"""
+
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Numba fuses the clip, scale and cast into one parallel loop when it's installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def to_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode a waveform as an in-memory 16-bit PCM WAV file.
+
+    Args:
+        audio: Mono float waveform in [-1, 1]
+        sample_rate: Sample rate of the waveform
+
+    Returns:
+        WAV file contents
+    """
+    pcm = float_to_pcm16(audio)
+    return wav_header(sample_rate, pcm.shape[0]) + pcm.tobytes()
+
+
+def float_to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert a float waveform in [-1, 1] to 16-bit PCM samples.
+
+    Args:
+        audio: Float waveform
+
+    Returns:
+        int16 samples
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if NUMBA_AVAILABLE:
+        out = np.empty(audio.shape[0], dtype=np.int16)
+        _f32_to_pcm16(audio, out)
+        return out
+
+    # Clip into a fresh buffer and scale it in place, so only one float temporary is made
+    scaled = np.clip(audio, -1.0, 1.0)
+    np.multiply(scaled, 32767.0, out=scaled)
+    return scaled.astype(np.int16)
+
+
+if NUMBA_AVAILABLE:
+    # Serial on purpose: chunks are small and a parallel loop would spin up Numba's
+    # thread pool inside every synthesis worker
+    @njit(cache=True)
+    def _f32_to_pcm16(x, out):
+        for i in range(x.shape[0]):
+            v = x[i] * 32767.0
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32767.0:
+                v = -32767.0
+            out[i] = np.int16(v)
+
+
+def wav_header(sample_rate: int, num_samples: Optional[int] = None) -> bytes:
+    """
+    Build a 44-byte header for a mono 16-bit PCM WAV file.
+
+    Args:
+        sample_rate: Sample rate of the audio
+        num_samples: Number of samples that follow, or None when streaming audio
+            of unknown length
+
+    Returns:
+        WAV header bytes
+    """
+    if num_samples is None:
+        # Players treat the maximum size as "read until end of stream"
+        data_size = 0xFFFFFFFF - 36
+    else:
+        data_size = num_samples * 2
+
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size
+    )
+
+
+def write_wav(path: str, audio: np.ndarray, sample_rate: int) -> None:
+    """
+    Write a waveform to disk as a mono 16-bit PCM WAV file.
+
+    The header and samples are written straight from their buffers with a
+    single writev call where the platform supports it.
+
+    Args:
+        path: Output file path
+        audio: Mono float waveform in [-1, 1]
+        sample_rate: Sample rate of the waveform
+    """
+    pcm = float_to_pcm16(audio)
+    buffers = [memoryview(wav_header(sample_rate, pcm.shape[0])), memoryview(pcm).cast("B")]
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if not hasattr(os, "writev"):
+            for buf in buffers:
+                while buf:
+                    buf = buf[os.write(fd, buf):]
+            return
+
+        while buffers:
+            written = os.writev(fd, buffers)
+            # Drop what was written and retry the rest after a short write
+            while buffers and written >= len(buffers[0]):
+                written -= len(buffers[0])
+                buffers.pop(0)
+            if written:
+                buffers[0] = buffers[0][written:]
+    finally:
+        os.close(fd)
@@ -0,0 +1,135 @@
+"""
+Caching helpers for the Voice AI Agent
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash the contents of a file without loading it fully into memory.
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes read per iteration
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def synthesis_cache_key(text: str, voice: Optional[str], speed: float, model_type: str) -> str:
+    """
+    Build the cache key for a synthesis request.
+
+    Args:
+        text: Text to synthesize
+        voice: Voice ID (or reference audio for Zonos)
+        speed: Speed factor
+        model_type: TTS model used ('kokoro' or 'zonos')
+
+    Returns:
+        Hex digest identifying the request
+    """
+    return hashlib.md5(f"{text}|{voice}|{speed}|{model_type}".encode()).hexdigest()
+
+
+class SynthesisCache:
+    """
+    Least-recently-used cache mapping synthesis keys to generated audio.
+
+    Values are usually WAV bytes or waveforms; values that are file paths
+    have their file removed from disk when evicted.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the oldest
+            max_bytes: Maximum total size of bytes and array values, or None for no limit
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached entry and mark it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        value = self._entries.get(key)
+        if value is None:
+            return None
+
+        # Drop entries whose file disappeared underneath us
+        if isinstance(value, str) and not os.path.exists(value):
+            del self._entries[key]
+            self._size -= self._sizeof(value)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store an entry, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Cached audio (WAV bytes, a waveform, a response payload or a file path)
+        """
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._size -= self._sizeof(previous)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._size += self._sizeof(value)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= self._sizeof(evicted)
+            self._discard(evicted)
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """
+        Size of a cached value in bytes, counting only bytes and array values.
+        """
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        return getattr(value, "nbytes", 0)
+
+    def _discard(self, value: Any) -> None:
+        """
+        Remove the file backing an evicted entry.
+        """
+        if isinstance(value, str) and os.path.exists(value):
+            try:
+                os.remove(value)
+            except OSError as e:
+                logger.warning(f"Failed to remove cached audio {value}: {e}")
@@ -2,13 +2,19 @@
 LangChain integration for the Voice AI Agent
 """
 
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 
+import soundfile as sf
 from langchain_core.callbacks import CallbackManagerForChainRun
 from langchain_core.chains import Chain
 
 from voice_agent.tts_engine import TTSEngine
 
+# Agents shared across callers, keyed by (model_type, language, precision, engine options)
+_agents: Dict[Tuple, Dict[str, Any]] = {}
+_agents_lock = threading.Lock()
+
 class VoiceChain(Chain):
     """
     LangChain implementation for the Voice AI Agent that processes text and
@@ -21,12 +27,13 @@ class VoiceChain(Chain):
     @property
     def input_keys(self) -> List[str]:
         """Return input keys."""
-        return ["text", "voice_id", "speed", "output_path"]
+        # voice_id, speed, output_path and reference_audio are optional
+        return ["text"]
     
     @property
     def output_keys(self) -> List[str]:
         """Return output keys."""
-        return [self.output_key]
+        return [self.output_key, "audio", "sample_rate", "num_samples"]
     
     def _call(
         self, 
@@ -41,23 +48,51 @@ class VoiceChain(Chain):
             run_manager: Callback manager for the chain run
             
         Returns:
-            Dictionary with path to the generated audio file
+            Dictionary with the path to the generated audio file (or the
+            waveform itself when no output path is given), its sample rate
+            and its length in samples
         """
         # Extract inputs
         text = inputs.get("text", "")
-        voice_id = inputs.get("voice_id", "af_heart")
+        voice_id = inputs.get("voice_id")
+        if voice_id is None and self.tts_engine.model_type == "kokoro":
+            voice_id = "af_heart"
         speed = float(inputs.get("speed", 1.0))
         output_path = inputs.get("output_path")
+        reference_audio = inputs.get("reference_audio")
+        
+        # Keep the audio in memory when the caller doesn't need a file
+        if output_path is None:
+            audio, sample_rate = self.tts_engine.generate(
+                text=text,
+                voice=voice_id,
+                speed=speed,
+                reference_audio=reference_audio
+            )
+            return {
+                self.output_key: None,
+                "audio": audio,
+                "sample_rate": sample_rate,
+                "num_samples": len(audio)
+            }
         
         # Synthesize speech
         audio_path = self.tts_engine.synthesize(
             text=text,
             voice=voice_id,
             speed=speed,
-            output_path=output_path
+            output_path=output_path,
+            reference_audio=reference_audio
         )
         
-        return {self.output_key: audio_path}
+        # Only the header is read to get the length
+        info = sf.info(audio_path)
+        return {
+            self.output_key: audio_path,
+            "audio": None,
+            "sample_rate": info.samplerate,
+            "num_samples": info.frames
+        }
 
 class VoiceCloningChain(Chain):
     """
@@ -86,7 +121,7 @@ class VoiceCloningChain(Chain):
         Clone a voice from an audio sample.
         
         Args:
-            inputs: Input dictionary with audio path and optional voice ID
+            inputs: Input dictionary with audio path, optional voice ID and make_default flag
             run_manager: Callback manager for the chain run
             
         Returns:
@@ -95,28 +130,35 @@ class VoiceCloningChain(Chain):
         # Extract inputs
         audio_path = inputs.get("audio_path")
         voice_id = inputs.get("voice_id")
+        make_default = inputs.get("make_default", False)
         
         # Clone voice
         cloned_voice_id = self.tts_engine.clone_voice(
             audio_path=audio_path,
-            voice_id=voice_id
+            voice_id=voice_id,
+            make_default=make_default
         )
         
         return {self.output_key: cloned_voice_id}
 
-def create_voice_agent(model_type: str = "kokoro", language: str = "en-us"):
+def create_voice_agent(model_type: str = "kokoro",
+                       language: str = "en-us",
+                       precision: Optional[str] = None,
+                       **engine_options: Any):
     """
     Create and configure the voice agent with LangChain components.
     
     Args:
         model_type: Type of TTS model to use ('kokoro' or 'zonos')
         language: Language code for speech synthesis (primarily for Zonos)
+        precision: Inference precision on CUDA ('fp32', 'fp16' or 'bf16'), or None for the model default
+        **engine_options: Additional keyword arguments for TTSEngine (e.g. compile_model)
     
     Returns:
         Dictionary with voice and cloning chains
     """
     # Initialize TTS engine with specified model type
-    tts_engine = TTSEngine(model_type=model_type, language=language)
+    tts_engine = TTSEngine(model_type=model_type, language=language, precision=precision, **engine_options)
     
     # Create voice synthesis chain
     voice_chain = VoiceChain(tts_engine=tts_engine)
@@ -129,3 +171,34 @@ def create_voice_agent(model_type: str = "kokoro", language: str = "en-us"):
         "cloning_chain": cloning_chain,
         "tts_engine": tts_engine
     }
+
+def get_voice_agent(model_type: str = "kokoro",
+                    language: str = "en-us",
+                    precision: Optional[str] = None,
+                    **engine_options: Any):
+    """
+    Return a shared voice agent, creating it on first use.
+    
+    Models are only loaded when first requested, so processes that only ever
+    use one model type never pay for loading the other.
+    
+    Args:
+        model_type: Type of TTS model to use ('kokoro' or 'zonos')
+        language: Language code for speech synthesis (primarily for Zonos)
+        precision: Inference precision on CUDA ('fp32', 'fp16' or 'bf16'), or None for the model default
+        **engine_options: Additional keyword arguments for TTSEngine (e.g. compile_model)
+    
+    Returns:
+        Dictionary with voice and cloning chains
+    """
+    key = (model_type, language, precision, tuple(sorted(engine_options.items())))
+    agent = _agents.get(key)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(key)
+            if agent is None:
+                agent = create_voice_agent(
+                    model_type=model_type, language=language, precision=precision, **engine_options
+                )
+                _agents[key] = agent
+    return agent
@@ -5,20 +5,32 @@ Core TTS engine for the Voice AI Agent supporting multiple TTS models including:
 """
 
 import os
+import atexit
+import hashlib
+import json
 import logging
+import multiprocessing
+import queue
+import re
+import shutil
 import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple, Iterator, Union
 
 import torch
 import numpy as np
 import soundfile as sf
 import torchaudio
-from pydub import AudioSegment
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from voice_agent.audio import float_to_pcm16, to_wav_bytes, wav_header, write_wav
+from voice_agent.cache import SynthesisCache
+
 logger = logging.getLogger(__name__)
 
 # Import TTS engines conditionally to avoid errors if one is not installed
@@ -37,19 +49,202 @@ except ImportError:
     logger.warning("Zonos not available. Install with 'pip install zonos'")
     ZONOS_AVAILABLE = False
 
+# ONNX Runtime is an alternative backend for running Kokoro
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# soxr gives SIMD polyphase resampling on the CPU for cloning samples
+try:
+    import soxr
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
+# fcntl serializes speaker registry updates between processes where it's available
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+# Models shared by every TTSEngine in the process, so creating another engine
+# doesn't reload weights: Kokoro pipelines keyed by (lang_code, device, int8, compiled),
+# Zonos models keyed by (model name, device, int8, compiled). Compilation replaces
+# the model in place, so eager and compiled engines must not share one
+ZONOS_MODEL_NAME = "Zyphra/Zonos-v0.1-hybrid"
+_KOKORO_PIPELINE_CACHE: Dict[Tuple[str, str, bool, bool], Any] = {}
+_ZONOS_MODEL_CACHE: Dict[Tuple[str, str, bool, bool], Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# ONNX Runtime sessions keyed by (model path, device) and the matching
+# phoneme-only Kokoro pipelines keyed by lang_code
+_ONNX_SESSION_CACHE: Dict[Tuple[str, str], Any] = {}
+_G2P_PIPELINE_CACHE: Dict[str, Any] = {}
+
+# GPUs available to synthesize_many, each served by its own worker process
+NUM_GPUS = torch.cuda.device_count()
+
+# Splits text after sentence-ending punctuation as well as at line breaks
+SENTENCE_SPLIT_PATTERN = r'(?<=[.!?])\s+|\n+'
+
+# Compiled Kokoro split patterns, so each pattern string is only compiled once
+_SPLIT_PATTERN_CACHE: Dict[str, "re.Pattern"] = {}
+
+
+def _compiled(pattern: Optional[str]) -> Optional["re.Pattern"]:
+    """
+    Return the compiled form of a split pattern, compiling it on first use.
+    """
+    if pattern is None:
+        return None
+    compiled = _SPLIT_PATTERN_CACHE.get(pattern)
+    if compiled is None:
+        compiled = _SPLIT_PATTERN_CACHE.setdefault(pattern, re.compile(pattern))
+    return compiled
+
+
+def _prefetch(iterator: Iterator, maxsize: int = 4) -> Iterator:
+    """
+    Run an iterator on a background thread, yielding its items through a bounded queue.
+    
+    This lets the producer compute the next item while the consumer handles the
+    current one. Exceptions raised by the producer are re-raised in the consumer.
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        # Give up if the consumer stopped reading so the thread can exit
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((None, e))
+        else:
+            put((done, None))
+    
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
 
 class TTSEngine:
     """
     Text-to-Speech engine that supports multiple TTS models:
     - Kokoro-82M: Lightweight, fast TTS model
     - Zonos-v0.1-hybrid: Higher quality, more expressive TTS model
+    
+    An engine may be shared between threads for synthesis; use
+    voice_agent.chain.get_voice_agent to reuse one loaded engine instead of
+    paying the model and voice loading cost again.
     """
+    # Preset voices available for each model
+    PRESET_VOICES = {
+        'kokoro': ['af_heart', 'af_woh', 'am_standard'],
+        # Zonos doesn't have preset voices like Kokoro
+        # Instead, it generates voices from reference audio
+        'zonos': [],
+    }
+    
+    # Directory used to store cloned voices when none is given
+    DEFAULT_VOICES_DIR = "voices"
+    
+    # File holding every saved Zonos speaker embedding, keyed by voice ID
+    SPEAKER_REGISTRY_FILE = "spk2info.pt"
+    
+    # Maximum number of Zonos speaker embeddings kept in memory
+    SPEAKER_CACHE_SIZE = 50
+    
+    # Precision used on CUDA when none is given
+    DEFAULT_PRECISION = {
+        'kokoro': 'bf16',
+        'zonos': 'bf16',
+    }
+    
+    # Buffer size used when streaming audio to disk
+    WRITE_BUFFER_SIZE = 128 * 1024
+    
+    # Utterances of increasing length synthesized to warm up a compiled model
+    WARMUP_TEXTS = (
+        "Hello.",
+        "This is a short warm-up sentence.",
+        "This is a somewhat longer warm-up sentence, so that the compiled model "
+        "has also seen a segment of typical length before the first request.",
+    )
+    
+    # Limits of the in-memory cache of synthesized Kokoro waveforms
+    WAVEFORM_CACHE_ENTRIES = 1024
+    WAVEFORM_CACHE_BYTES = 256 * 1024 * 1024
+    
+    # Size the on-disk waveform cache is pruned back to, oldest files first
+    DISK_CACHE_BYTES = 1024 * 1024 * 1024
+    
+    # Maximum number of non-preset Kokoro voice packs kept in memory
+    VOICE_PACK_CACHE_SIZE = 16
+    
+    # Kokoro segments longer than this many characters (about one phoneme each) are
+    # split again at sentence boundaries, so forward passes stay within a few sizes
+    MAX_SEGMENT_CHARS = 256
+    
+    # Speed factors applied by resampling normal-speed Kokoro audio when resample_speed is set
+    RESAMPLE_SPEED_RANGE = (0.8, 1.25)
+    
+    # Seconds a listing of cloned Kokoro voices is reused before rescanning the directory
+    VOICE_LIST_TTL = 5.0
+    
+    # Maximum number of texts in one synthesize_many batch
+    MAX_BATCH = 8
+    
+    # Inference backends for Kokoro
+    BACKENDS = ('torch', 'onnx')
+    
+    # Kokoro ONNX model loaded by the onnx backend when no path is given
+    ONNX_MODEL_FILE = "kokoro-quant-gpu.onnx"
+    
+    # Torch dtypes for the supported inference precisions
+    PRECISIONS = {
+        'fp32': torch.float32,
+        'fp16': torch.float16,
+        'bf16': torch.bfloat16,
+    }
+    
     def __init__(self, 
                  model_type: str = 'kokoro',
                  lang_code: str = 'a',
                  language: str = 'en-us',
                  device: Optional[str] = None,
-                 voices_dir: Optional[str] = None):
+                 voices_dir: Optional[str] = None,
+                 precision: Optional[str] = None,
+                 compile_model: bool = False,
+                 enable_int8: bool = False,
+                 disk_cache: bool = False,
+                 backend: str = 'torch',
+                 onnx_model: Optional[str] = None,
+                 resample_speed: bool = False):
         """
         Initialize the TTS engine.
         
@@ -59,48 +254,122 @@ class TTSEngine:
             language: Language code for Zonos ('en-us', 'ja-jp', etc.)
             device: Device to run inference on ('cuda' or 'cpu')
             voices_dir: Directory to store voice embeddings for cloning
+            precision: Inference precision on CUDA ('fp32', 'fp16' or 'bf16'), defaults
+                to bf16 (fp16 on GPUs without bf16 support)
+            compile_model: Compile the model with torch.compile
+            enable_int8: Quantize linear layers to int8 when running on CPU
+            disk_cache: Also keep synthesized Kokoro waveforms on disk under voices_dir/cache
+            backend: Kokoro inference backend ('torch' or 'onnx')
+            onnx_model: Path to the Kokoro ONNX model used by the onnx backend
+            resample_speed: Apply small Kokoro speed changes by resampling normal-speed
+                audio instead of re-running the model (this also shifts the pitch)
         """
         self.model_type = model_type.lower()
         self.lang_code = lang_code
+        self.backend = backend.lower()
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Choose one of {', '.join(self.BACKENDS)}")
+        if self.backend == 'onnx' and self.model_type != 'kokoro':
+            # Only Kokoro has an ONNX export; other models keep running on torch
+            self.backend = 'torch'
+        
+        # ONNX Runtime session and phoneme vocabulary, set by the onnx backend
+        self.session = None
+        self._onnx_vocab: Dict[str, int] = {}
+        
+        # Settings needed to build the same engine in a synthesize_many worker
+        self._worker_options = dict(
+            model_type=model_type, lang_code=lang_code, language=language,
+            voices_dir=voices_dir, precision=precision, compile_model=compile_model,
+            enable_int8=enable_int8, disk_cache=disk_cache, backend=backend, onnx_model=onnx_model,
+            resample_speed=resample_speed,
+        )
+        self._gpu_pools: List[ProcessPoolExecutor] = []
+        self._gpu_pools_lock = threading.Lock()
         self.language = language
         
+        default_precision = precision is None
+        if default_precision:
+            precision = self.DEFAULT_PRECISION.get(self.model_type, 'fp32')
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}. Choose one of {', '.join(self.PRECISIONS)}")
+        
         # Set device (use CUDA if available)
         if device is None:
             self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         else:
             self.device = device
         
-        logger.info(f"Initializing TTS Engine with {self.model_type} model on {self.device}")
+        # Pre-Ampere GPUs lack bf16 tensor cores, so fall back to fp16 by default
+        if (default_precision and precision == 'bf16' and self.device.startswith('cuda')
+                and not torch.cuda.is_bf16_supported()):
+            precision = 'fp16'
+        self.precision = precision
+        
+        logger.info(f"Initializing TTS Engine with {self.model_type} model on {self.device} ({self.precision})")
         
         # Initialize appropriate model
         if self.model_type == 'kokoro':
             if not KOKORO_AVAILABLE:
                 raise ImportError("Kokoro is not installed. Install with 'pip install kokoro'")
             
-            try:
-                self.pipeline = KPipeline(lang_code=lang_code)
-                logger.info("Kokoro pipeline initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Kokoro pipeline: {e}")
-                raise
+            if self.backend == 'onnx':
+                self._init_kokoro_onnx(onnx_model or self.ONNX_MODEL_FILE)
+            else:
+                try:
+                    quantize = enable_int8 and self.device == 'cpu'
+                    key = (lang_code, self.device, quantize, compile_model)
+                    with _MODEL_CACHE_LOCK:
+                        pipeline = _KOKORO_PIPELINE_CACHE.get(key)
+                        if pipeline is None:
+                            pipeline = KPipeline(lang_code=lang_code)
+                            # KPipeline picks its own device, so place the model explicitly
+                            if getattr(pipeline, "model", None) is not None:
+                                pipeline.model = pipeline.model.to(self.device).eval()
+                                if quantize:
+                                    pipeline.model = torch.ao.quantization.quantize_dynamic(
+                                        pipeline.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                                    )
+                                    logger.info("Quantized Kokoro linear layers to int8")
+                            _KOKORO_PIPELINE_CACHE[key] = pipeline
+                    self.pipeline = pipeline
+                    logger.info("Kokoro pipeline initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize Kokoro pipeline: {e}")
+                    raise
+                
                 
             # Available preset voices for Kokoro
-            self.available_voices = ['af_heart', 'af_woh', 'am_standard']
+            self.available_voices = list(self.PRESET_VOICES['kokoro'])
                 
         elif self.model_type == 'zonos':
             if not ZONOS_AVAILABLE:
                 raise ImportError("Zonos is not installed. Install with 'pip install zonos'")
-                
+            
             try:
-                self.model = Zonos.from_pretrained(
-                    "Zyphra/Zonos-v0.1-hybrid", 
-                    device=self.device
-                )
+                quantize = enable_int8 and self.device == 'cpu'
+                key = (ZONOS_MODEL_NAME, self.device, quantize, compile_model)
+                with _MODEL_CACHE_LOCK:
+                    model = _ZONOS_MODEL_CACHE.get(key)
+                    if model is None:
+                        model = Zonos.from_pretrained(
+                            ZONOS_MODEL_NAME, 
+                            device=self.device
+                        )
+                        
+                        if quantize:
+                            # int8 weights and VNNI dot products for the compute-bound linear layers
+                            torch.backends.quantized.engine = "fbgemm"
+                            model = torch.quantization.quantize_dynamic(
+                                model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8, inplace=True
+                            )
+                            logger.info("Quantized Zonos linear layers to int8")
+                        
+                        _ZONOS_MODEL_CACHE[key] = model
+                self.model = model
                 logger.info("Zonos model initialized successfully")
                 
-                # Zonos doesn't have preset voices like Kokoro
-                # Instead, it generates voices from reference audio
-                self.available_voices = []
+                self.available_voices = list(self.PRESET_VOICES['zonos'])
                 
             except Exception as e:
                 logger.error(f"Failed to initialize Zonos model: {e}")
@@ -110,13 +379,542 @@ class TTSEngine:
         
         # Set up voices directory
         if voices_dir is None:
-            self.voices_dir = Path("voices")
+            self.voices_dir = Path(self.DEFAULT_VOICES_DIR)
         else:
             self.voices_dir = Path(voices_dir)
         
+        # Directories already created, so repeated clones skip the mkdir syscall
+        self._mkdir_cache: set = set()
+        
         # Create voices directory if it doesn't exist
-        if not self.voices_dir.exists():
-            self.voices_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(self.voices_dir)
+        
+        # Kokoro waveforms keyed by (lang_code, voice, speed, split_pattern, text)
+        self.disk_cache = disk_cache
+        self.resample_speed = resample_speed and SOXR_AVAILABLE
+        self._waveform_cache = SynthesisCache(
+            max_entries=self.WAVEFORM_CACHE_ENTRIES, max_bytes=self.WAVEFORM_CACHE_BYTES
+        )
+        self._waveform_cache_lock = threading.Lock()
+        self._disk_cache_size: Optional[int] = None
+        self._disk_cache_lock = threading.Lock()
+        
+        # Speaker embeddings keyed by reference audio, so repeated references skip the encoder
+        self._spk_cache: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._spk_cache_cap = self.SPEAKER_CACHE_SIZE
+        self._spk_cache_lock = threading.Lock()
+        
+        # Last listing of voices and when it stops being reused
+        self._voices_cache: Optional[Dict[str, List[str]]] = None
+        self._voices_cache_expiry = 0.0
+        
+        # Resampling kernels keyed by (input rate, output rate)
+        self._resamplers: Dict[Tuple[int, int], torchaudio.transforms.Resample] = {}
+        
+        # Load voice embeddings once up front instead of on every request
+        if self.model_type == 'kokoro':
+            self._preload_kokoro_voices()
+            if compile_model and self.session is None:
+                self._compile_kokoro()
+        else:
+            self._load_speaker_registry()
+            if compile_model:
+                self._compile_zonos()
+        
+        # Device inference really runs on, which can differ from the requested one
+        self.actual_device = self._probe_device()
+        logger.info(f"{self.model_type} inference is running on {self.actual_device}")
+    
+    def _probe_device(self) -> str:
+        """
+        Check that inference runs on the requested device instead of silently falling back to the CPU.
+        
+        Returns:
+            The device inference actually runs on
+            
+        Raises:
+            RuntimeError: If a CUDA device was requested but the model runs elsewhere
+        """
+        if self.session is not None:
+            provider = self.session.get_providers()[0]
+            actual = 'cuda' if provider == 'CUDAExecutionProvider' else 'cpu'
+            if self.device.startswith('cuda') and actual != 'cuda':
+                raise RuntimeError(
+                    f"Kokoro ONNX session is using {provider} instead of CUDA; "
+                    "install onnxruntime-gpu with a CUDA version matching the driver"
+                )
+            return actual
+        
+        model = self.pipeline.model if self.model_type == 'kokoro' else self.model
+        param = next(iter(model.parameters()), None) if isinstance(model, torch.nn.Module) else None
+        actual = str(param.device) if param is not None else self.device
+        if not self.device.startswith('cuda'):
+            return actual
+        if not actual.startswith('cuda'):
+            raise RuntimeError(f"{self.model_type} weights are on {actual} although {self.device} was requested")
+        
+        # Weights on the GPU don't guarantee the forward uses it, so run a tiny synthesis
+        # and check that it allocated CUDA memory
+        if self.model_type == 'kokoro' and self._voice_idx:
+            device = torch.device(actual)
+            torch.cuda.synchronize(device)
+            torch.cuda.reset_peak_memory_stats(device)
+            before = torch.cuda.memory_allocated(device)
+            self._generate_kokoro("hi", next(iter(self._voice_idx)))
+            if torch.cuda.max_memory_allocated(device) <= before:
+                raise RuntimeError(f"Kokoro did not run on CUDA although {self.device} was requested")
+        return actual
+    
+    def _init_kokoro_onnx(self, model_path: str):
+        """
+        Load the Kokoro ONNX model into an ONNX Runtime session, with a phoneme-only
+        Kokoro pipeline as its text front-end.
+        
+        Args:
+            model_path: Path to the Kokoro ONNX model
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("ONNX Runtime is not installed. Install with 'pip install onnxruntime-gpu'")
+        
+        try:
+            with _MODEL_CACHE_LOCK:
+                pipeline = _G2P_PIPELINE_CACHE.get(self.lang_code)
+                if pipeline is None:
+                    pipeline = KPipeline(lang_code=self.lang_code, model=False)
+                    _G2P_PIPELINE_CACHE[self.lang_code] = pipeline
+                
+                key = (os.path.abspath(model_path), self.device)
+                session = _ONNX_SESSION_CACHE.get(key)
+                if session is None:
+                    session = self._create_onnx_session(model_path)
+                    _ONNX_SESSION_CACHE[key] = session
+        except Exception as e:
+            logger.error(f"Failed to initialize Kokoro ONNX session: {e}")
+            raise
+        
+        self.pipeline = pipeline
+        self.session = session
+        self._onnx_inputs = [i.name for i in session.get_inputs()]
+        
+        # Phoneme to token ID mapping shipped with the Kokoro weights
+        from huggingface_hub import hf_hub_download
+        config_path = hf_hub_download(repo_id=getattr(pipeline, "repo_id", "hexgrad/Kokoro-82M"), filename="config.json")
+        with open(config_path, encoding="utf-8") as f:
+            self._onnx_vocab = json.load(f)["vocab"]
+        
+        logger.info(f"Kokoro ONNX session initialized with {session.get_providers()[0]}")
+    
+    def _create_onnx_session(self, model_path: str):
+        """
+        Create an ONNX Runtime session, preferring CUDA, then CoreML, then the CPU.
+        """
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.intra_op_num_threads = os.cpu_count() or 0
+        
+        available = set(ort.get_available_providers())
+        providers: List[Any] = []
+        if self.device.startswith('cuda') and 'CUDAExecutionProvider' in available:
+            device_id = int(self.device.partition(':')[2] or 0)
+            providers.append(('CUDAExecutionProvider', {'device_id': device_id, 'cudnn_conv_algo_search': 'DEFAULT'}))
+        if 'CoreMLExecutionProvider' in available:
+            providers.append('CoreMLExecutionProvider')
+        providers.append('CPUExecutionProvider')
+        
+        return ort.InferenceSession(model_path, sess_options=so, providers=providers)
+    
+    def _onnx_forward(self, phonemes: str, pack: torch.Tensor, speed: float) -> np.ndarray:
+        """
+        Run one phonemized Kokoro segment through the ONNX model.
+        """
+        ids = [0, *(self._onnx_vocab[p] for p in phonemes if p in self._onnx_vocab), 0]
+        style = pack[len(phonemes) - 1].reshape(1, -1).float().numpy()
+        feeds = dict(zip(self._onnx_inputs, (
+            np.array([ids], dtype=np.int64),
+            style,
+            np.array([speed], dtype=np.float32),
+        )))
+        return self.session.run(None, feeds)[0].reshape(-1)
+    
+    def _preload_kokoro_voices(self):
+        """
+        Load the preset Kokoro voice packs into one stacked tensor indexed by voice ID.
+        """
+        packs = []
+        self._voice_idx: Dict[str, int] = {}
+        for voice in self.available_voices:
+            try:
+                pack = self.pipeline.load_voice(voice)
+            except Exception as e:
+                logger.warning(f"Failed to preload Kokoro voice {voice}: {e}")
+                continue
+            self._voice_idx[voice] = len(packs)
+            packs.append(pack.float().cpu())
+        
+        self._voice_embeds = torch.stack(packs) if packs else None
+        
+        # Other voices are loaded on first use and kept in a small LRU
+        self._voice_packs: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._voice_packs_lock = threading.Lock()
+    
+    def _ensure_dir(self, path: Path):
+        """
+        Create a directory (and its parents) unless this engine already created it.
+        """
+        if path in self._mkdir_cache:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._mkdir_cache.add(path)
+    
+    def _load_speaker_registry(self):
+        """
+        Load the Zonos speaker registry, importing per-voice embedding files on first use.
+        """
+        self._spk_registry_path = self.voices_dir / self.SPEAKER_REGISTRY_FILE
+        self._spk_registry: Dict[str, torch.Tensor] = {}
+        self._spk_registry_mtime: Optional[int] = None
+        if self._reload_speaker_registry():
+            return
+        
+        # Migrate voices saved as one speaker_embedding.pt per directory
+        migrated = {}
+        for d in self.voices_dir.iterdir():
+            embedding_file = d / "speaker_embedding.pt"
+            if d.name.startswith("zonos_") and embedding_file.exists():
+                voice_id = "default" if d.name == "zonos_default" else d.name
+                migrated[voice_id] = torch.load(embedding_file, map_location=self.device)
+        
+        if migrated:
+            self._update_speaker_registry(migrated)
+            logger.info(f"Imported {len(migrated)} Zonos voices into {self._spk_registry_path}")
+    
+    def _reload_speaker_registry(self) -> bool:
+        """
+        Reload the Zonos speaker registry if another engine or process rewrote it.
+        
+        Returns:
+            Whether a newer registry was loaded
+        """
+        try:
+            f = open(self._spk_registry_path, "rb")
+        except FileNotFoundError:
+            return False
+        with f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            if mtime == self._spk_registry_mtime:
+                return False
+            registry = torch.load(f, map_location=self.device)
+        self._spk_registry, self._spk_registry_mtime = registry, mtime
+        return True
+    
+    def _compile_kokoro(self):
+        """
+        Compile the Kokoro model with torch.compile, falling back to eager on failure.
+        
+        Short warm-up utterances are synthesized so the common segment shapes are
+        compiled at startup rather than on the first requests.
+        """
+        if not hasattr(torch, "compile") or getattr(self.pipeline, "model", None) is None:
+            logger.warning("torch.compile is not available, running Kokoro eagerly")
+            return
+        if getattr(self.pipeline, "_tts_compiled", False):
+            # Shared pipeline already compiled by another engine
+            return
+        
+        model = self.pipeline.model
+        try:
+            self.pipeline.model = torch.compile(model, mode="reduce-overhead", dynamic=True, fullgraph=False)
+            if self._voice_idx:
+                voice = next(iter(self._voice_idx))
+                for text in self.WARMUP_TEXTS:
+                    self._generate_kokoro(text, voice)
+            self.pipeline._tts_compiled = True
+            logger.info("Compiled Kokoro model with torch.compile")
+        except Exception as e:
+            logger.warning(f"Failed to compile Kokoro model, running eagerly: {e}")
+            self.pipeline.model = model
+    
+    def _compile_zonos(self):
+        """
+        Compile Zonos generation and decoding with torch.compile, falling back to eager on failure.
+        
+        When a default speaker exists a short warm-up utterance is generated so the
+        compilation cost is paid at startup rather than on the first request.
+        """
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile is not available, running Zonos eagerly")
+            return
+        if getattr(self.model, "_tts_compiled", False):
+            # Shared model already compiled by another engine
+            return
+        
+        generate, decode = self.model.generate, self.model.autoencoder.decode
+        try:
+            self.model.generate = torch.compile(generate, mode="reduce-overhead", dynamic=True, fullgraph=False)
+            self.model.autoencoder.decode = torch.compile(decode, mode="reduce-overhead", dynamic=True, fullgraph=False)
+            if "default" in self._spk_registry:
+                self._generate_zonos("Warm up.", "default")
+            self.model._tts_compiled = True
+            logger.info("Compiled Zonos model with torch.compile")
+        except Exception as e:
+            logger.warning(f"Failed to compile Zonos model, running eagerly: {e}")
+            self.model.generate, self.model.autoencoder.decode = generate, decode
+    
+    @contextmanager
+    def _speaker_registry_lock(self):
+        """
+        Hold the speaker registry lock of this engine and, where supported, of the registry file.
+        """
+        with self._spk_cache_lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(f"{self._spk_registry_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _update_speaker_registry(self, updates: Dict[str, torch.Tensor]):
+        """
+        Merge speaker embeddings into the registry on disk.
+        
+        The registry is reloaded under the lock first, so voices saved by other
+        engines or processes are kept, and replaced atomically so a crash mid-write
+        can't corrupt it.
+        
+        Args:
+            updates: Speaker embeddings keyed by voice ID
+        """
+        with self._speaker_registry_lock():
+            self._reload_speaker_registry()
+            registry = {**self._spk_registry, **updates}
+            
+            tmp_path = self._spk_registry_path.with_name(f".{self.SPEAKER_REGISTRY_FILE}.{uuid.uuid4().hex}")
+            try:
+                torch.save(registry, tmp_path)
+                os.replace(tmp_path, self._spk_registry_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            self._spk_registry = registry
+            self._spk_registry_mtime = os.stat(self._spk_registry_path).st_mtime_ns
+    
+    def _lookup_speaker(self, voice: Optional[str]) -> torch.Tensor:
+        """
+        Return the saved speaker embedding for a Zonos voice.
+        
+        No voice selects the default speaker.
+        
+        Args:
+            voice: Saved voice ID
+            
+        Returns:
+            Speaker embedding
+            
+        Raises:
+            ValueError: If the voice isn't saved
+        """
+        if voice is None:
+            voice = "default"
+        
+        speaker = self._spk_registry.get(voice)
+        if speaker is None and self._reload_speaker_registry():
+            # Cloned by another engine or process since the registry was loaded
+            speaker = self._spk_registry.get(voice)
+        if speaker is None:
+            if voice == "default":
+                raise ValueError("Reference audio is required for Zonos when no default speaker embedding exists")
+            raise ValueError(f"Unknown Zonos voice: {voice}")
+        return speaker
+    
+    def _load_mono(self, audio_path: str) -> Tuple[torch.Tensor, int]:
+        """
+        Load an audio file onto the engine's device as a mono float32 tensor.
+        
+        The channels are downmixed on the device with one reduction and an
+        in-place divide.
+        
+        Args:
+            audio_path: Path to the audio file
+            
+        Returns:
+            Tuple of (audio tensor of shape (1, samples), sample rate)
+        """
+        wav, sampling_rate = torchaudio.load(audio_path)
+        if self.device.startswith('cuda'):
+            # Pinned host memory lets the copy to the GPU run asynchronously
+            wav = wav.pin_memory()
+        wav = wav.to(self.device, non_blocking=True)
+        if wav.shape[0] > 1:  # Convert stereo to mono if needed
+            wav = wav.to(torch.float32, copy=False).sum(dim=0, keepdim=True).div_(wav.shape[0])
+        return wav, sampling_rate
+    
+    def _get_or_build_speaker(self, reference_audio: str) -> torch.Tensor:
+        """
+        Return the Zonos speaker embedding for a reference audio file.
+        
+        Embeddings are cached by a hash of the file's first 64 KB and its
+        modification time, so the audio is only loaded and encoded once.
+        
+        Args:
+            reference_audio: Path to the reference audio
+            
+        Returns:
+            Speaker embedding tensor
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(reference_audio, "rb") as f:
+            digest.update(f.read(64 * 1024))
+        digest.update(str(os.path.getmtime(reference_audio)).encode())
+        key = digest.hexdigest()
+        
+        with self._spk_cache_lock:
+            speaker = self._spk_cache.get(key)
+            if speaker is not None:
+                self._spk_cache.move_to_end(key)
+                return speaker
+        
+        logger.info("Creating speaker embedding from reference audio: %s", reference_audio)
+        wav, sampling_rate = self._load_mono(reference_audio)
+        speaker = self.model.make_speaker_embedding(wav, sampling_rate)
+        
+        with self._spk_cache_lock:
+            self._spk_cache[key] = speaker
+            self._spk_cache.move_to_end(key)
+            while len(self._spk_cache) > self._spk_cache_cap:
+                self._spk_cache.popitem(last=False)
+        
+        return speaker
+    
+    def _resample(self, wav: torch.Tensor, sr_in: int, sr_out: int) -> torch.Tensor:
+        """
+        Resample audio on the engine's device, reusing the filter kernel for each rate pair.
+        
+        Args:
+            wav: Audio tensor of shape (channels, samples)
+            sr_in: Sample rate of the input
+            sr_out: Desired sample rate
+            
+        Returns:
+            Resampled audio on the CPU
+        """
+        if sr_in == sr_out:
+            return wav.cpu()
+        
+        resampler = self._resamplers.get((sr_in, sr_out))
+        if resampler is None:
+            resampler = torchaudio.transforms.Resample(sr_in, sr_out, lowpass_filter_width=16).to(self.device)
+            self._resamplers[(sr_in, sr_out)] = resampler
+        
+        with torch.inference_mode():
+            return resampler(wav.to(self.device)).cpu()
+    
+    def _autocast(self):
+        """
+        Return an autocast context for the configured precision.
+        
+        Autocast is used rather than casting the weights because voice packs and
+        conditioning tensors are produced in fp32. It is a no-op for fp32 or off CUDA.
+        """
+        if self.precision == 'fp32' or not self.device.startswith('cuda'):
+            return nullcontext()
+        return torch.autocast(device_type='cuda', dtype=self.PRECISIONS[self.precision])
+    
+    def _zonos_cudnn_flags(self):
+        """
+        Return a context that enables cuDNN autotuning and TF32 convolutions for Zonos.
+        
+        Zonos decodes fixed shapes, so autotuning pays off. Kokoro's inputs change length
+        with every segment, which would rerun it on nearly every request. The flags are
+        restored on exit, so other engines in the process keep their settings.
+        """
+        if not self.device.startswith('cuda'):
+            return nullcontext()
+        return torch.backends.cudnn.flags(
+            enabled=torch.backends.cudnn.enabled,
+            benchmark=True,
+            deterministic=torch.backends.cudnn.deterministic,
+            allow_tf32=True
+        )
+    
+    def _resolve_voice(self, voice: str):
+        """
+        Return the voice pack for a voice ID, loading and caching it for non-preset voices.
+        """
+        if not isinstance(voice, str):
+            # Already a voice pack
+            return voice
+        idx = self._voice_idx.get(voice)
+        if idx is not None:
+            return self._voice_embeds[idx]
+        
+        with self._voice_packs_lock:
+            pack = self._voice_packs.get(voice)
+            if pack is not None:
+                self._voice_packs.move_to_end(voice)
+                return pack
+        
+        # KPipeline only accepts voice packs as CPU float tensors; it moves the
+        # selected style vector to the model's device itself
+        pack = self.pipeline.load_voice(voice).float().cpu()
+        with self._voice_packs_lock:
+            self._voice_packs[voice] = pack
+            while len(self._voice_packs) > self.VOICE_PACK_CACHE_SIZE:
+                self._voice_packs.popitem(last=False)
+        return pack
+    
+    def voice_version(self, voice: Optional[str], reference_audio: Optional[str] = None) -> str:
+        """
+        Return a token that changes whenever the audio produced for a voice can change.
+        
+        It is the modification time of what the speaker comes from: the reference
+        audio, the Zonos speaker registry, or the sample of a cloned Kokoro voice.
+        Callers put it into cache keys so re-cloning a voice invalidates them.
+        
+        Args:
+            voice: Voice ID
+            reference_audio: Path to reference audio (Zonos)
+            
+        Returns:
+            Version token, "-" when there is nothing on disk to track
+        """
+        if reference_audio is not None:
+            path = reference_audio
+        elif self.model_type == 'zonos':
+            path = self._spk_registry_path
+        elif voice is not None and voice not in self.PRESET_VOICES['kokoro']:
+            path = self.voices_dir / voice / "sample.wav"
+        else:
+            return "-"
+        
+        try:
+            return str(os.stat(path).st_mtime_ns)
+        except (OSError, ValueError):
+            return "-"
+    
+    @property
+    def sample_rate(self) -> int:
+        """
+        Sample rate of the audio produced by the current model.
+        """
+        if self.model_type == 'zonos':
+            return self.model.autoencoder.sampling_rate
+        return 24000
+    
+    @staticmethod
+    def _temp_wav_path() -> str:
+        """
+        Reserve a fresh temporary WAV path with a single exclusive open.
+        """
+        while True:
+            path = os.path.join(tempfile.gettempdir(), f"tts_{uuid.uuid4().hex}.wav")
+            try:
+                os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+                return path
+            except FileExistsError:
+                continue
     
     def synthesize(self, 
                   text: str, 
@@ -124,102 +922,577 @@ class TTSEngine:
                   speed: float = 1.0,
                   output_path: Optional[str] = None,
                   split_pattern: str = r'\n+',
-                  reference_audio: Optional[str] = None) -> str:
+                  reference_audio: Optional[str] = None,
+                  return_bytes: bool = False) -> Union[str, bytes]:
         """
         Synthesize speech from text.
         
         Args:
             text: Input text to synthesize
-            voice: Voice to use (preset or cloned voice ID for Kokoro, or ignored for Zonos)
+            voice: Voice to use (preset or cloned voice ID; saved voice ID for Zonos)
             speed: Speed factor (1.0 is normal)
             output_path: Path to save the output audio
             split_pattern: Pattern to split text into chunks (for Kokoro)
             reference_audio: Path to reference audio for voice cloning (required for Zonos)
+            return_bytes: Return the WAV file contents instead of writing a file
             
         Returns:
-            Path to the generated audio file
+            Path to the generated audio file, or its contents if return_bytes is set
         """
-        logger.info(f"Synthesizing text with model {self.model_type}")
+        if return_bytes:
+            audio, sample_rate = self.generate(
+                text,
+                voice=voice,
+                speed=speed,
+                split_pattern=split_pattern,
+                reference_audio=reference_audio
+            )
+            return to_wav_bytes(audio, sample_rate)
         
         # Create output path if not provided
         if output_path is None:
-            # Create a temporary file if no output path is provided
-            temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            output_path = temp_file.name
-            temp_file.close()
+            output_path = self._temp_wav_path()
         
         if self.model_type == 'kokoro':
-            return self._synthesize_kokoro(text, voice, speed, output_path, split_pattern)
+            # Write each segment as 16-bit PCM as soon as it's generated while the next one
+            # is computed, through a large user-space buffer so small segments don't each
+            # cost a syscall, then fill in the final length in the header
+            with open(output_path, 'wb', buffering=self.WRITE_BUFFER_SIZE) as f:
+                f.write(wav_header(24000, 0))
+                num_samples = 0
+                for audio in _prefetch(self.synthesize_stream(text, voice, speed, split_pattern)):
+                    pcm = float_to_pcm16(audio)
+                    f.write(memoryview(pcm).cast("B"))
+                    num_samples += pcm.shape[0]
+                f.seek(0)
+                f.write(wav_header(24000, num_samples))
+            logger.info("Saved %s synthesized audio to %s", self.model_type, output_path)
+            return output_path
+        
+        audio, sample_rate = self.generate(
+            text,
+            voice=voice,
+            speed=speed,
+            split_pattern=split_pattern,
+            reference_audio=reference_audio
+        )
+        
+        # Save audio to file
+        write_wav(output_path, audio, sample_rate)
+        logger.info("Saved %s synthesized audio to %s", self.model_type, output_path)
+        
+        return output_path
+    
+    def generate(self,
+                 text: str,
+                 voice: str = 'af_heart',
+                 speed: float = 1.0,
+                 split_pattern: str = r'\n+',
+                 reference_audio: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize speech from text and return the waveform in memory.
+        
+        Args:
+            text: Input text to synthesize
+            voice: Voice to use (preset or cloned voice ID; saved voice ID for Zonos)
+            speed: Speed factor (1.0 is normal)
+            split_pattern: Pattern to split text into chunks (for Kokoro)
+            reference_audio: Path to reference audio for voice cloning (required for Zonos)
+            
+        Returns:
+            Tuple of (mono float32 waveform, sample rate)
+        """
+        logger.info("Synthesizing text with model %s", self.model_type)
+        
+        if self.model_type == 'kokoro':
+            return self._generate_kokoro_cached(text, voice, speed, split_pattern)
         elif self.model_type == 'zonos':
-            return self._synthesize_zonos(text, reference_audio, output_path)
+            return self._generate_zonos(text, voice, reference_audio)
         else:
             raise ValueError(f"Unsupported model type: {self.model_type}")
     
-    def _synthesize_kokoro(self,
+    def _generate_kokoro_cached(self,
+                                text: str,
+                                voice: str,
+                                speed: float,
+                                split_pattern: str,
+                                voice_pack: Optional[torch.Tensor] = None) -> Tuple[np.ndarray, int]:
+        """
+        Synthesize with Kokoro, reusing the waveform of an identical earlier request.
+        
+        Waveforms are kept in a size-capped in-memory LRU and, when a disk cache is
+        enabled, as WAV files under `voices_dir/cache`. Cached arrays are read-only.
+        """
+        key = (self.lang_code, voice, speed, split_pattern, text)
+        with self._waveform_cache_lock:
+            audio = self._waveform_cache.get(key)
+        if audio is not None:
+            return audio, 24000
+        
+        # Small speed changes reuse the normal-speed waveform and are cheap to
+        # redo, so they are only kept in memory
+        resample = self._resamples_speed(speed)
+        
+        cache_file = None
+        if self.disk_cache and not resample:
+            digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+            cache_file = self.voices_dir / "cache" / f"{digest}.wav"
+            try:
+                audio, _ = sf.read(cache_file, dtype='float32')
+                os.utime(cache_file)
+            except (OSError, RuntimeError):
+                # Not cached yet, or evicted in the meantime
+                audio = None
+        
+        if audio is None and resample:
+            base, _ = self._generate_kokoro_cached(text, voice, 1.0, split_pattern, voice_pack)
+            audio = soxr.resample(base, 24000, int(round(24000 / speed)), quality='HQ')
+        elif audio is None:
+            audio, _ = self._generate_kokoro(text, voice if voice_pack is None else voice_pack, speed, split_pattern)
+            if cache_file is not None:
+                self._write_disk_cache(cache_file, audio)
+        
+        audio.flags.writeable = False
+        with self._waveform_cache_lock:
+            self._waveform_cache.put(key, audio)
+        return audio, 24000
+    
+    def _write_disk_cache(self, cache_file: Path, audio: np.ndarray):
+        """
+        Add a waveform to the on-disk cache, pruning the oldest files past DISK_CACHE_BYTES.
+        
+        The file is written under a temporary name and renamed into place, so a
+        concurrent reader never sees it half-written.
+        """
+        self._ensure_dir(cache_file.parent)
+        tmp_file = cache_file.with_name(f".{cache_file.stem}.{uuid.uuid4().hex}.wav")
+        try:
+            write_wav(str(tmp_file), audio, 24000)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        
+        with self._disk_cache_lock:
+            if self._disk_cache_size is None:
+                self._disk_cache_size = sum(size for _, size, _ in self._disk_cache_entries(cache_file.parent))
+            else:
+                self._disk_cache_size += os.path.getsize(cache_file)
+            if self._disk_cache_size <= self.DISK_CACHE_BYTES:
+                return
+            
+            # Prune to 90% of the limit so every write doesn't rescan the directory
+            entries = sorted(self._disk_cache_entries(cache_file.parent))
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in entries:
+                if size <= self.DISK_CACHE_BYTES * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+            self._disk_cache_size = size
+    
+    @staticmethod
+    def _disk_cache_entries(cache_dir: Path) -> List[Tuple[float, int, str]]:
+        """
+        List the (mtime, size, path) of the finished files in the disk cache.
+        """
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+    
+    def _resamples_speed(self, speed: float) -> bool:
+        """
+        Whether a Kokoro speed is applied by resampling normal-speed audio.
+        """
+        low, high = self.RESAMPLE_SPEED_RANGE
+        return self.resample_speed and speed != 1.0 and low <= speed <= high
+    
+    def generate_batch(self,
+                       texts: List[str],
+                       voice: str = 'af_heart',
+                       speed: float = 1.0,
+                       split_pattern: str = r'\n+',
+                       reference_audio: Optional[str] = None) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize several texts that share the same voice settings.
+        
+        Args:
+            texts: Input texts to synthesize
+            voice: Voice to use (preset or cloned voice ID; saved voice ID for Zonos)
+            speed: Speed factor (1.0 is normal)
+            split_pattern: Pattern to split text into chunks (for Kokoro)
+            reference_audio: Path to reference audio for voice cloning (required for Zonos)
+            
+        Returns:
+            List of (mono float32 waveform, sample rate) tuples in input order
+        """
+        return list(self._iter_batch(texts, voice, speed, split_pattern, reference_audio))
+    
+    def _iter_batch(self,
+                    texts: List[str],
+                    voice: str,
+                    speed: float,
+                    split_pattern: str,
+                    reference_audio: Optional[str]) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Yield (waveform, sample rate) for each text of a batch as soon as it's synthesized.
+        """
+        if self.model_type == 'kokoro':
+            # Resolve the voice pack once for the whole batch. KModel expands
+            # durations for one sequence at a time, so segments still go through
+            # the model one by one.
+            voice_pack = self._resolve_voice(voice)
+            logger.info("Synthesizing batch of %d texts with Kokoro using voice %s", len(texts), voice)
+            for text in texts:
+                # Scoped per text so inference mode doesn't leak to the consumer across yields
+                with torch.inference_mode():
+                    result = self._generate_kokoro_cached(text, voice, speed, split_pattern, voice_pack)
+                yield result
+            return
+        
+        for text in texts:
+            yield self.generate(
+                text,
+                voice=voice,
+                speed=speed,
+                split_pattern=split_pattern,
+                reference_audio=reference_audio
+            )
+    
+    def synthesize_batch(self,
+                         texts: List[str],
+                         voice: str = 'af_heart',
+                         speed: float = 1.0,
+                         output_paths: Optional[List[str]] = None,
+                         split_pattern: str = r'\n+',
+                         reference_audio: Optional[str] = None) -> List[str]:
+        """
+        Synthesize several texts that share the same voice settings to audio files.
+        
+        Args:
+            texts: Input texts to synthesize
+            voice: Voice to use (preset or cloned voice ID; saved voice ID for Zonos)
+            speed: Speed factor (1.0 is normal)
+            output_paths: Paths to save the output audio, one per text (temporary files if omitted)
+            split_pattern: Pattern to split text into chunks (for Kokoro)
+            reference_audio: Path to reference audio for voice cloning (required for Zonos)
+            
+        Returns:
+            Paths to the generated audio files in input order
+        """
+        if output_paths is None:
+            output_paths = [self._temp_wav_path() for _ in texts]
+        elif len(output_paths) != len(texts):
+            raise ValueError("output_paths must have one path per text")
+        
+        # Encode and write each file on a background thread while the next text is synthesized
+        writes: queue.Queue = queue.Queue(maxsize=4)
+        errors: List[BaseException] = []
+        
+        def write_files():
+            while (item := writes.get()) is not None:
+                if errors:
+                    continue  # keep draining so the producer never blocks
+                try:
+                    write_wav(*item)
+                except BaseException as e:
+                    errors.append(e)
+        
+        writer = threading.Thread(target=write_files, name="tts-writer", daemon=True)
+        writer.start()
+        try:
+            results = self._iter_batch(texts, voice, speed, split_pattern, reference_audio)
+            for path, (audio, sample_rate) in zip(output_paths, results):
+                writes.put((path, audio, sample_rate))
+        finally:
+            writes.put(None)
+            writer.join()
+        if errors:
+            raise errors[0]
+        
+        logger.info("Saved %d %s synthesized audio files", len(texts), self.model_type)
+        return output_paths
+    
+    def synthesize_many(self,
+                        texts: List[str],
+                        voices: List[str],
+                        speed: float = 1.0,
+                        split_pattern: str = r'\n+') -> List[str]:
+        """
+        Synthesize a large job of texts to audio files, spread across every GPU.
+        
+        Texts are grouped by voice and sorted by length, so each batch holds texts
+        of similar length, and the batches are dealt round-robin to one worker
+        process per GPU, which stays up for later jobs until close() is called.
+        Without several GPUs the batches run on this engine.
+        
+        Args:
+            texts: Input texts to synthesize
+            voices: Voice to use for each text
+            speed: Speed factor (1.0 is normal)
+            split_pattern: Pattern to split text into chunks (for Kokoro)
+            
+        Returns:
+            Paths to the generated audio files in input order
+        """
+        if len(voices) != len(texts):
+            raise ValueError("voices must have one voice per text")
+        
+        output_paths = [self._temp_wav_path() for _ in texts]
+        
+        by_voice: Dict[str, List[int]] = {}
+        for i, voice in enumerate(voices):
+            by_voice.setdefault(voice, []).append(i)
+        
+        batches = []
+        for voice, indices in by_voice.items():
+            indices.sort(key=lambda i: len(texts[i]))
+            for start in range(0, len(indices), self.MAX_BATCH):
+                chunk = indices[start:start + self.MAX_BATCH]
+                batches.append((
+                    [texts[i] for i in chunk], voice, speed,
+                    [output_paths[i] for i in chunk], split_pattern,
+                ))
+        
+        if NUM_GPUS < 2:
+            for batch in batches:
+                self.synthesize_batch(*batch)
+            return output_paths
+        
+        pools = self._get_gpu_pools()
+        futures: List[Future] = [
+            pools[n % len(pools)].submit(_synthesize_in_worker, *batch)
+            for n, batch in enumerate(batches)
+        ]
+        for future in futures:
+            future.result()
+        
+        logger.info(f"Synthesized {len(texts)} texts across {len(pools)} GPUs")
+        return output_paths
+    
+    def _get_gpu_pools(self) -> List[ProcessPoolExecutor]:
+        """
+        Start one single-process worker pool per GPU, each holding its own engine.
+        """
+        with self._gpu_pools_lock:
+            if not self._gpu_pools:
+                # CUDA can't be used from a forked child, so workers are spawned
+                context = multiprocessing.get_context("spawn")
+                self._gpu_pools = [
+                    ProcessPoolExecutor(
+                        max_workers=1,
+                        mp_context=context,
+                        initializer=_init_gpu_worker,
+                        initargs=(gpu, self._worker_options),
+                    )
+                    for gpu in range(NUM_GPUS)
+                ]
+                atexit.register(self.close)
+            return self._gpu_pools
+    
+    def close(self):
+        """
+        Shut down the synthesize_many worker processes, if any were started.
+        """
+        with self._gpu_pools_lock:
+            pools, self._gpu_pools = self._gpu_pools, []
+        for pool in pools:
+            pool.shutdown(cancel_futures=True)
+        if pools:
+            atexit.unregister(self.close)
+    
+    def synthesize_stream(self,
                           text: str,
                           voice: str = 'af_heart',
                           speed: float = 1.0,
-                          output_path: str = None,
-                          split_pattern: str = r'\n+') -> str:
+                          split_pattern: str = SENTENCE_SPLIT_PATTERN,
+                          reference_audio: Optional[str] = None) -> Iterator[np.ndarray]:
         """
-        Synthesize speech using Kokoro-82M model.
+        Synthesize speech from text, yielding audio as it is produced.
+        
+        Kokoro yields one chunk per text segment; Zonos yields the whole
+        utterance as a single chunk. Text is split per sentence by default so
+        the first chunk arrives quickly.
+        
+        Args:
+            text: Input text to synthesize
+            voice: Voice to use (preset or cloned voice ID; saved voice ID for Zonos)
+            speed: Speed factor (1.0 is normal)
+            split_pattern: Pattern to split text into chunks (for Kokoro)
+            reference_audio: Path to reference audio for voice cloning (required for Zonos)
+            
+        Yields:
+            Mono float32 audio chunks at `sample_rate`
         """
-        logger.info(f"Synthesizing text with Kokoro using voice {voice}")
+        if self.model_type == 'kokoro':
+            chunks = self._stream_kokoro(text, voice, speed, split_pattern)
+        elif self.model_type == 'zonos':
+            chunks = iter([self._generate_zonos(text, voice, reference_audio)[0]])
+        else:
+            raise ValueError(f"Unsupported model type: {self.model_type}")
         
-        # Generate audio segments
-        audio_segments = []
+        start = time.perf_counter()
+        first = next(chunks, None)
+        if first is None:
+            return
+        logger.info("First %s chunk ready after %.0f ms", self.model_type, (time.perf_counter() - start) * 1000)
+        yield first
+        yield from chunks
+    
+    def _stream_kokoro(self,
+                       text: str,
+                       voice: str = 'af_heart',
+                       speed: float = 1.0,
+                       split_pattern: str = r'\n+') -> Iterator[np.ndarray]:
+        """
+        Yield Kokoro-82M audio segment by segment.
+        """
+        resampler = None
+        if self._resamples_speed(speed):
+            # Stream through one resampler so segment boundaries stay seamless
+            resampler = soxr.ResampleStream(24000, int(round(24000 / speed)), 1, dtype='float32', quality='HQ')
+            speed = 1.0
+        
+        for audio in self._kokoro_segments(text, voice, speed, split_pattern):
+            if torch.is_tensor(audio):
+                audio = audio.float().cpu().numpy()
+            if resampler is not None:
+                audio = resampler.resample_chunk(np.asarray(audio, dtype=np.float32))
+                if not audio.size:
+                    continue
+            yield audio
+        
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if tail.size:
+                yield tail
+    
+    def _kokoro_segments(self,
+                         text: str,
+                         voice: str = 'af_heart',
+                         speed: float = 1.0,
+                         split_pattern: str = r'\n+') -> Iterator[Any]:
+        """
+        Yield the raw Kokoro-82M segments, leaving tensors on the device they were produced on.
+        """
+        if isinstance(voice, str):
+            # Batches pass the resolved voice pack instead and log the voice ID themselves
+            logger.info("Synthesizing text with Kokoro using voice %s", voice)
+        
+        pack = self._resolve_voice(voice)
+        if len(text) > self.MAX_SEGMENT_CHARS:
+            text = "\n".join(self._segment_text(text, split_pattern))
+            split_pattern = r'\n+'
         generator = self.pipeline(
             text, 
-            voice=voice, 
+            voice=pack, 
             speed=speed, 
-            split_pattern=split_pattern
+            split_pattern=_compiled(split_pattern)
         )
         
-        for i, (gs, ps, audio) in enumerate(generator):
-            logger.debug(f"Generated segment {i}: {gs[:30]}...")
-            audio_segments.append(audio)
+        # Only use inference mode and autocast while a segment is being generated, not across yields
+        debug = logger.isEnabledFor(logging.DEBUG)
+        i = 0
+        while True:
+            with torch.inference_mode(), self._autocast():
+                result = next(generator, None)
+            if result is None:
+                break
+            
+            gs, ps, audio = result
+            if self.session is not None:
+                # The phoneme-only pipeline leaves synthesis to the ONNX model
+                if not ps:
+                    continue
+                audio = self._onnx_forward(ps, pack, speed)
+            if debug:
+                logger.debug("Generated segment %d: %.30s...", i, gs)
+            yield audio
+            i += 1
+    
+    def _segment_text(self, text: str, split_pattern: Optional[str]) -> List[str]:
+        """
+        Split text with the split pattern, then pack the sentences of any segment
+        longer than MAX_SEGMENT_CHARS into pieces of at most that length.
         
-        # Combine audio segments
-        combined_audio = np.concatenate(audio_segments)
+        Args:
+            text: Input text
+            split_pattern: Pattern the caller asked to split the text with
+            
+        Returns:
+            Non-empty text segments in order
+        """
+        pattern = _compiled(split_pattern)
+        parts = pattern.split(text) if pattern is not None else [text]
+        sentence_pattern = _compiled(SENTENCE_SPLIT_PATTERN)
         
-        # Save audio to file
-        sf.write(output_path, combined_audio, 24000)
-        logger.info(f"Saved Kokoro synthesized audio to {output_path}")
+        segments: List[str] = []
+        for part in parts:
+            if not part or not part.strip():
+                continue
+            if len(part) <= self.MAX_SEGMENT_CHARS:
+                segments.append(part)
+                continue
+            
+            # A single sentence longer than the limit is kept whole; KPipeline
+            # still splits it at the model's own maximum
+            current = ""
+            for sentence in sentence_pattern.split(part):
+                if not sentence:
+                    continue
+                if current and len(current) + 1 + len(sentence) > self.MAX_SEGMENT_CHARS:
+                    segments.append(current)
+                    current = sentence
+                else:
+                    current = f"{current} {sentence}" if current else sentence
+            if current:
+                segments.append(current)
+        return segments
+    
+    def _generate_kokoro(self,
+                         text: str,
+                         voice: str = 'af_heart',
+                         speed: float = 1.0,
+                         split_pattern: str = r'\n+') -> Tuple[np.ndarray, int]:
+        """
+        Synthesize speech using Kokoro-82M model.
+        """
+        segments = [
+            audio if torch.is_tensor(audio) else torch.from_numpy(audio)
+            for audio in self._kokoro_segments(text, voice, speed, split_pattern)
+        ]
+        if not segments:
+            return np.zeros(0, dtype=np.float32), 24000
         
-        return output_path
+        # KPipeline already returns CPU tensors, so one torch.cat sizes the output exactly
+        combined = segments[0] if len(segments) == 1 else torch.cat(segments, dim=-1)
+        return combined.float().numpy(), 24000
     
-    def _synthesize_zonos(self,
+    def _generate_zonos(self,
                         text: str,
-                        reference_audio: Optional[str] = None,
-                        output_path: str = None) -> str:
+                        voice: Optional[str] = None,
+                        reference_audio: Optional[str] = None) -> Tuple[np.ndarray, int]:
         """
         Synthesize speech using Zonos-v0.1-hybrid model.
         """
-        logger.info(f"Synthesizing text with Zonos")
+        logger.info("Synthesizing text with Zonos")
         
         if reference_audio is None:
-            # Check if there's a default speaker embedding
-            speaker_dir = self.voices_dir / "zonos_default"
-            speaker_file = speaker_dir / "speaker_embedding.pt"
-            
-            if speaker_file.exists():
-                logger.info(f"Using default speaker embedding from {speaker_file}")
-                speaker = torch.load(speaker_file, map_location=self.device)
-            else:
-                raise ValueError("Reference audio is required for Zonos when no default speaker embedding exists")
+            speaker = self._lookup_speaker(voice)
         else:
-            # Load reference audio and create speaker embedding
-            logger.info(f"Creating speaker embedding from reference audio: {reference_audio}")
-            wav, sampling_rate = torchaudio.load(reference_audio)
-            if wav.shape[0] > 1:  # Convert stereo to mono if needed
-                wav = torch.mean(wav, dim=0, keepdim=True)
-            speaker = self.model.make_speaker_embedding(wav, sampling_rate)
-            
-            # Save the speaker embedding for future use
-            speaker_dir = self.voices_dir / f"zonos_{Path(reference_audio).stem}"
-            speaker_dir.mkdir(exist_ok=True, parents=True)
-            speaker_file = speaker_dir / "speaker_embedding.pt"
-            torch.save(speaker, speaker_file)
+            # Reference embeddings are only cached in memory; voices are saved by cloning
+            speaker = self._get_or_build_speaker(reference_audio)
         
         # Create conditioning dictionary
         cond_dict = make_cond_dict(
@@ -228,16 +1501,25 @@ class TTSEngine:
             language=self.language
         )
         
-        # Prepare conditioning and generate audio
-        conditioning = self.model.prepare_conditioning(cond_dict)
-        codes = self.model.generate(conditioning)
-        wavs = self.model.autoencoder.decode(codes).cpu()
+        # Prepare conditioning and generate audio, on a side stream on CUDA so the
+        # device-to-host copy of the result is asynchronous
+        if self.device.startswith('cuda'):
+            stream = torch.cuda.Stream(device=self.device)
+            stream.wait_stream(torch.cuda.current_stream(self.device))
+            stream_context = torch.cuda.stream(stream)
+        else:
+            stream = None
+            stream_context = nullcontext()
         
-        # Save audio
-        torchaudio.save(output_path, wavs[0], self.model.autoencoder.sampling_rate)
-        logger.info(f"Saved Zonos synthesized audio to {output_path}")
+        with torch.inference_mode(), self._autocast(), self._zonos_cudnn_flags(), stream_context:
+            conditioning = self.model.prepare_conditioning(cond_dict)
+            codes = self.model.generate(conditioning)
+            wavs = self.model.autoencoder.decode(codes).float().to("cpu", non_blocking=True)
+        if stream is not None:
+            stream.synchronize()
         
-        return output_path
+        # Zonos decodes a single mono channel per batch item
+        return wavs[0, 0].numpy(), self.model.autoencoder.sampling_rate
     
     def clone_voice(self, audio_path: str, 
                    voice_id: Optional[str] = None,
@@ -273,17 +1555,30 @@ class TTSEngine:
         
         # Copy the audio sample to the voices directory
         voice_dir = self.voices_dir / voice_id
-        voice_dir.mkdir(exist_ok=True)
+        self._ensure_dir(voice_dir)
         
-        # Process the sample (convert to proper format if needed)
-        sample = AudioSegment.from_file(audio_path)
-        sample = sample.set_frame_rate(24000)
-        sample = sample.set_channels(1)
-        
-        # Save processed sample
+        # Process the sample (convert to 24 kHz mono if needed)
         sample_path = voice_dir / "sample.wav"
-        sample.export(sample_path, format="wav")
+        try:
+            # WAV/FLAC/OGG decode directly through libsndfile
+            audio, sampling_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+        except RuntimeError:
+            # Formats libsndfile can't read go through torchaudio's decoders
+            wav, sampling_rate = self._load_mono(audio_path)
+            wav = self._resample(wav, sampling_rate, 24000)
+            torchaudio.save(str(sample_path), wav, 24000, encoding="PCM_S", bits_per_sample=16)
+        else:
+            audio = audio.mean(axis=1)
+            if sampling_rate != 24000:
+                if SOXR_AVAILABLE:
+                    audio = soxr.resample(audio, sampling_rate, 24000, quality='HQ')
+                else:
+                    audio = self._resample(torch.from_numpy(audio)[None], sampling_rate, 24000)[0].numpy()
+            
+            # Save processed sample
+            write_wav(str(sample_path), audio, 24000)
         
+        self._voices_cache = None
         logger.info(f"Cloned Kokoro voice saved with ID: {voice_id}")
         return voice_id
     
@@ -296,33 +1591,28 @@ class TTSEngine:
             voice_id = f"zonos_{os.path.basename(audio_path).split('.')[0]}"
         
         # Create speaker embedding
-        logger.info(f"Creating Zonos speaker embedding from: {audio_path}")
-        wav, sampling_rate = torchaudio.load(audio_path)
-        if wav.shape[0] > 1:  # Convert stereo to mono if needed
-            wav = torch.mean(wav, dim=0, keepdim=True)
-        speaker_embedding = self.model.make_speaker_embedding(wav, sampling_rate)
-        
-        # Save the speaker embedding
-        voice_dir = self.voices_dir / voice_id
-        voice_dir.mkdir(exist_ok=True, parents=True)
-        embedding_path = voice_dir / "speaker_embedding.pt"
-        torch.save(speaker_embedding, embedding_path)
+        speaker_embedding = self._get_or_build_speaker(audio_path)
         
-        # Save a copy of the original audio for reference
-        sample = AudioSegment.from_file(audio_path)
-        sample_path = voice_dir / "sample.wav"
-        sample.export(sample_path, format="wav")
+        # Save the speaker embedding, also as the default if requested
+        updates = {voice_id: speaker_embedding}
+        if make_default:
+            updates["default"] = speaker_embedding
+        self._update_speaker_registry(updates)
         
-        # If this is set as default, create a link or copy to the default location
         if make_default:
-            default_dir = self.voices_dir / "zonos_default"
-            default_dir.mkdir(exist_ok=True, parents=True)
-            default_path = default_dir / "speaker_embedding.pt"
-            
-            # Save a copy as the default embedding
-            torch.save(speaker_embedding, default_path)
             logger.info(f"Set {voice_id} as default Zonos voice")
         
+        # Save a copy of the original audio for reference
+        voice_dir = self.voices_dir / voice_id
+        self._ensure_dir(voice_dir)
+        sample_path = voice_dir / "sample.wav"
+        if Path(audio_path).suffix.lower() == ".wav":
+            # Already a WAV, so copy it rather than decoding it again
+            shutil.copyfile(audio_path, sample_path)
+        else:
+            wav, sampling_rate = torchaudio.load(audio_path)
+            torchaudio.save(str(sample_path), wav, sampling_rate, encoding="PCM_S", bits_per_sample=16)
+        
         logger.info(f"Cloned Zonos voice saved with ID: {voice_id}")
         return voice_id
     
@@ -333,44 +1623,103 @@ class TTSEngine:
         Returns:
             Dictionary with preset and cloned voices
         """
-        if self.model_type == 'kokoro':
-            return self._list_voices_kokoro()
-        elif self.model_type == 'zonos':
-            return self._list_voices_zonos()
+        if self.model_type == 'zonos':
+            self._reload_speaker_registry()
+            return self._registry_voices(self._spk_registry)
+        
+        # Reuse a recent directory scan; cloning through this engine invalidates it
+        now = time.monotonic()
+        voices = self._voices_cache
+        if voices is None or now >= self._voices_cache_expiry:
+            voices = self.list_voices_static(self.model_type, self.voices_dir)
+            self._voices_cache = voices
+            self._voices_cache_expiry = now + self.VOICE_LIST_TTL
+        return {name: list(ids) for name, ids in voices.items()}
+    
+    @classmethod
+    def list_voices_static(cls,
+                           model_type: str = 'kokoro',
+                           voices_dir: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        List available voices for a model without loading its weights.
+        
+        Args:
+            model_type: TTS model to list voices for ('kokoro' or 'zonos')
+            voices_dir: Directory where cloned voices are stored
+            
+        Returns:
+            Dictionary with preset and cloned voices
+        """
+        voices_dir = Path(voices_dir if voices_dir is not None else cls.DEFAULT_VOICES_DIR)
+        model_type = model_type.lower()
+        
+        if model_type == 'kokoro':
+            return cls._list_voices_kokoro(voices_dir)
+        elif model_type == 'zonos':
+            return cls._list_voices_zonos(voices_dir)
         else:
             return {"preset": [], "cloned": []}
     
-    def _list_voices_kokoro(self) -> Dict[str, List[str]]:
+    @classmethod
+    def _list_voices_kokoro(cls, voices_dir: Path) -> Dict[str, List[str]]:
         """
         List available Kokoro voices.
         """
-        # Get cloned Kokoro voices
+        # Get cloned Kokoro voices; DirEntry.is_dir uses the type readdir already returned
         cloned_voices = []
-        if self.voices_dir.exists():
-            cloned_voices = [d.name for d in self.voices_dir.iterdir() 
-                           if d.is_dir() and d.name.startswith("kokoro_")]
+        try:
+            with os.scandir(voices_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith("kokoro_") and entry.is_dir(follow_symlinks=False):
+                        cloned_voices.append(entry.name)
+        except FileNotFoundError:
+            pass
         
         return {
-            "preset": self.available_voices,
+            "preset": list(cls.PRESET_VOICES['kokoro']),
             "cloned": cloned_voices
         }
     
-    def _list_voices_zonos(self) -> Dict[str, List[str]]:
+    @classmethod
+    def _list_voices_zonos(cls, voices_dir: Path) -> Dict[str, List[str]]:
         """
         List available Zonos voices.
         """
-        # Get cloned Zonos voices
-        cloned_voices = []
-        if self.voices_dir.exists():
-            # Only include directories that have the speaker_embedding.pt file
-            cloned_voices = [d.name for d in self.voices_dir.iterdir() 
-                           if d.is_dir() and d.name.startswith("zonos_") 
-                           and (d / "speaker_embedding.pt").exists()]
-        
-        # Check if we have a default voice
-        has_default = (self.voices_dir / "zonos_default" / "speaker_embedding.pt").exists()
-        
+        registry_path = voices_dir / cls.SPEAKER_REGISTRY_FILE
+        registry = torch.load(registry_path, map_location="cpu") if registry_path.exists() else {}
+        return cls._registry_voices(registry)
+    
+    @staticmethod
+    def _registry_voices(registry: Dict[str, torch.Tensor]) -> Dict[str, List[str]]:
+        """
+        Split the voice IDs in a Zonos speaker registry into preset and cloned voices.
+        """
         return {
-            "preset": ["default"] if has_default else [],
-            "cloned": cloned_voices
+            "preset": ["default"] if "default" in registry else [],
+            "cloned": [voice_id for voice_id in registry if voice_id != "default"]
         }
+
+
+# Engine held by a synthesize_many worker process
+_WORKER_ENGINE: Optional[TTSEngine] = None
+
+
+def _init_gpu_worker(gpu: int, options: Dict[str, Any]):
+    """
+    Load the engine of a synthesize_many worker on its GPU.
+    """
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = TTSEngine(device=f"cuda:{gpu}", **options)
+
+
+def _synthesize_in_worker(texts: List[str],
+                          voice: str,
+                          speed: float,
+                          output_paths: List[str],
+                          split_pattern: str) -> List[str]:
+    """
+    Synthesize one batch of a synthesize_many job on this worker's engine.
+    """
+    return _WORKER_ENGINE.synthesize_batch(
+        texts, voice=voice, speed=speed, output_paths=output_paths, split_pattern=split_pattern
+    )